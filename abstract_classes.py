@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
+from http_transport import get_default_transport
 
 
 class ApiEngine(ABC):
 
+    def __init__(self, transport=None):
+        """Все движки по умолчанию используют общий пул соединений"""
+        self.transport = transport or get_default_transport()
+
     @abstractmethod
     def get_city_id(self):
         pass
@@ -0,0 +1,92 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+AREA_CACHE_FILE = "hh_areas_cache.json"
+AREA_CACHE_TTL = 7 * 24 * 60 * 60  # Справочник регионов HH меняется редко
+
+
+def normalize_city_name(city_name):
+    """Приведение названия города к единому виду: регистр, ё/е, пробелы"""
+    name = city_name.strip().lower().replace("ё", "е")
+    name = re.sub(r"\s*-\s*", "-", name)
+    return re.sub(r"\s+", " ", name)
+
+
+class AreaCache:
+    """Кэш соответствия названий городов и id регионов HeadHunter на диске"""
+
+    def __init__(self, path=AREA_CACHE_FILE, ttl=AREA_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.areas = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Загрузка кэша с диска, устаревшие записи отбрасываются"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self.lock:
+            self.areas = {name: entry for name, entry in stored.items()
+                          if now - entry[1] < self.ttl}
+
+    def save(self):
+        """Сохранение кэша на диск"""
+        with self.lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.areas, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def get(self, city_name):
+        """Получение id региона по названию, None если нет или устарел"""
+        entry = self.areas.get(normalize_city_name(city_name))
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def set(self, city_name, area_id, persist=True):
+        """Добавление соответствия название - id региона"""
+        with self.lock:
+            self.areas[normalize_city_name(city_name)] = [area_id, time.time()]
+        if persist:
+            self.save()
+
+    def preload(self, transport, hh_api_url="https://api.hh.ru", headers=None):
+        """Загрузка всего дерева регионов из /areas одним запросом"""
+        tree = transport.get_json(hh_api_url + "/areas", headers=headers)
+        saved_at = time.time()
+        loaded = {}
+        # Обход в ширину: при совпадении названий остается регион верхнего уровня
+        queue = deque(tree)
+        while queue:
+            area = queue.popleft()
+            loaded.setdefault(normalize_city_name(area["name"]), [area["id"], saved_at])
+            queue.extend(area.get("areas") or [])
+        with self.lock:
+            self.areas.update(loaded)
+        self.save()
+        return len(self.areas)
+
+
+_default_area_cache = None
+_default_area_cache_lock = threading.Lock()
+
+
+def get_default_area_cache():
+    """Общий экземпляр кэша регионов"""
+    global _default_area_cache
+    with _default_area_cache_lock:
+        if _default_area_cache is None:
+            _default_area_cache = AreaCache()
+        return _default_area_cache
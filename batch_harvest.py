@@ -0,0 +1,359 @@
+import argparse
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, product
+
+from hh_vac_getter import HHApiEngine, iter_hh_vac_info_validation, iter_hh_data_formatting
+from sj_vac_getter import SJApiEngine, iter_sj_vac_info_validation, iter_sj_data_formatting
+from json_manager import JsonOperator
+from jsonl_manager import JsonLinesOperator
+from http_transport import ApiError, HttpTransport
+from currency_rates import CurrencyRates, get_default_currency_rates
+from response_cache import ResponseCache
+from sqlite_manager import SQLITE_MAX_PARAMS, SQLiteOperator
+from incremental_sync import IncrementalSync
+from dedup import VacancyDeduplicator
+from metrics import Profiler, write_reports
+
+PLATFORMS = {
+    "hh": ("HeadHunter", HHApiEngine, iter_hh_vac_info_validation, iter_hh_data_formatting),
+    "sj": ("SuperJob", SJApiEngine, iter_sj_vac_info_validation, iter_sj_data_formatting)
+}
+HARVEST_BATCH_SIZE = 100  # Вакансий в одной пачке от потока сбора к записи
+DEFAULT_OUTPUT = "json_vac_info.json"
+
+
+def read_lines(file_name):
+    """Чтение непустых строк из файла списка городов или профессий"""
+    with open(file_name, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def harvest_query(platform, city_name, prof_name, transport, max_pages, rates):
+    """Генератор собранных, проверенных и приведенных к общему виду вакансий одного запроса
+
+    rates - таблица курсов валют, загруженная до начала сбора.
+    """
+    _, engine_class, validation, formatting = PLATFORMS[platform]
+    engine = engine_class(city_name, prof_name, transport=transport)
+    return formatting(validation(engine.iter_vacancies(max_pages), rates=rates), rates)
+
+
+class BatchHarvester:
+    """Пакетный сбор вакансий по всем сочетаниям город x профессия на платформах"""
+
+    def __init__(self, cities, professions, platforms=("hh", "sj"), workers=4,
+                 transport=None, max_pages=None, progress=None, sink=None, harvest=None,
+                 batch_size=HARVEST_BATCH_SIZE, rates=None):
+        self.cities = cities
+        self.professions = professions
+        self.platforms = platforms
+        self.workers = workers
+        self.transport = transport or HttpTransport(max_concurrency=workers * 2)
+        self.max_pages = max_pages
+        self.progress = progress or print_progress
+        # Вызывается для каждой пачки вакансий запроса, например для записи в базу
+        self.sink = sink
+        self.harvest = harvest or harvest_query
+        self.batch_size = batch_size
+        # Курсы загружаются один раз до запуска потоков, проверка и перевод
+        # зарплат в потоках к сети не обращаются
+        self.rates = rates
+        self.errors = []
+
+    def run(self):
+        """Запуск всех запросов, возвращает объединенный список без дублей по id вакансии"""
+        return list(self.iter_vacancies())
+
+    def iter_vacancies(self):
+        """Генератор вакансий всех запросов по мере загрузки, без дублей по id вакансии
+
+        Запросы выполняются в потоках, готовые пачки передаются через
+        ограниченную очередь, поэтому в памяти находится лишь несколько пачек
+        на поток, а не весь результат. sink вызывается в потоке, читающем
+        генератор, так что запись в хранилище идет из одного потока.
+        """
+        tasks = list(product(self.platforms, self.cities, self.professions))
+        results = queue.Queue(maxsize=self.workers * 2)
+        stopped = threading.Event()
+        seen = set()
+        done = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for task in tasks:
+                executor.submit(self._harvest_task, task, results, stopped)
+            while done < len(tasks):
+                kind, task, value = results.get()
+                if kind == "done":
+                    done += 1
+                    self.progress(done, len(tasks), task, value)
+                elif kind == "error":
+                    self.errors.append((task, value))
+                else:
+                    if self.sink is not None:
+                        self.sink(task, value)
+                    for vacancy in value:
+                        if vacancy.vacancy_id not in seen:
+                            seen.add(vacancy.vacancy_id)
+                            yield vacancy
+        finally:
+            # Потоки, ждущие места в очереди, завершаются, если чтение прервано
+            stopped.set()
+            executor.shutdown(cancel_futures=True)
+
+    def _harvest_task(self, task, results, stopped):
+        """Выполнение одного запроса с передачей вакансий пачками в очередь"""
+        count = 0
+        try:
+            vacancies = iter(self.harvest(*task, self.transport, self.max_pages, self.rates))
+            while not stopped.is_set():
+                batch = list(islice(vacancies, self.batch_size))
+                if not batch:
+                    break
+                count += len(batch)
+                put_result(results, stopped, ("batch", task, batch))
+        except Exception as error:
+            # Ошибка одного запроса (сеть, не JSON, неожиданный формат ответа)
+            # не прерывает сбор по остальным
+            put_result(results, stopped, ("error", task, error))
+        put_result(results, stopped, ("done", task, count))
+
+
+def put_result(results, stopped, item):
+    """Передача в очередь с ожиданием места, пока чтение не прервано"""
+    while not stopped.is_set():
+        try:
+            results.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def print_progress(done, total, task, found):
+    """Вывод прогресса пакетного сбора в stderr"""
+    platform, city_name, prof_name = task
+    print(f"[{done}/{total}] {PLATFORMS[platform][0]} / {city_name} / {prof_name}: "
+          f"{found} вакансий", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный сбор вакансий с HeadHunter и SuperJob")
+    parser.add_argument("--cities", nargs="*", default=[], help="Список городов")
+    parser.add_argument("--cities-file", help="Файл со списком городов, по одному в строке")
+    parser.add_argument("--professions", nargs="*", default=[], help="Список профессий")
+    parser.add_argument("--professions-file", help="Файл со списком профессий, по одной в строке")
+    parser.add_argument("--platforms", nargs="+", choices=sorted(PLATFORMS), default=["hh", "sj"])
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Количество одновременно выполняемых запросов")
+    parser.add_argument("--max-pages", type=int, help="Ограничение страниц на один запрос")
+    parser.add_argument("--output",
+                        help=f"Файл результата (по умолчанию {DEFAULT_OUTPUT}), в файл .jsonl "
+                             f"вакансии дописываются. При --incremental пишется только "
+                             f"если указан, и содержит изменения этого запуска")
+    parser.add_argument("--db", help="База SQLite, в которой накапливаются вакансии всех запусков")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Загружать только новые и измененные вакансии (нужен --db)")
+    parser.add_argument("--sync-state", default="sync_state.json",
+                        help="Файл с отметками последней синхронизации запросов")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Не объединять одинаковые вакансии с разных платформ")
+    parser.add_argument("--cache-dir", help="Каталог кэша ответов API")
+    parser.add_argument("--preload-areas", action="store_true",
+                        help="Загрузить справочник регионов HeadHunter одним запросом до "
+                             "начала сбора, если каких-то городов нет в кэше регионов")
+    parser.add_argument("--currency-rates",
+                        help="JSON файл с курсами валют вместо справочника HeadHunter")
+    parser.add_argument("--metrics-json", help="Файл сводки метрик в формате JSON")
+    parser.add_argument("--metrics-prom", help="Файл метрик в текстовом формате Prometheus")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="Профилировать запуск (cProfile и tracemalloc), "
+                             "отчеты пишутся в файлы с этим префиксом")
+    parser.add_argument("--offline", action="store_true",
+                        help="Брать ответы только из кэша, без обращения к сети")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = Profiler(args.profile).start() if args.profile else None
+    try:
+        return run(args)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        write_reports(args.metrics_json, args.metrics_prom)
+
+
+def run(args):
+    cities = args.cities + (read_lines(args.cities_file) if args.cities_file else [])
+    professions = args.professions + (read_lines(args.professions_file)
+                                      if args.professions_file else [])
+    if not cities or not professions:
+        print("Нужно указать хотя бы один город и одну профессию", file=sys.stderr)
+        return 2
+
+    cache = None
+    if args.cache_dir or args.offline:
+        cache = ResponseCache(args.cache_dir or "http_cache", offline=args.offline)
+    transport = HttpTransport(cache=cache, max_concurrency=args.workers * 2)
+    if args.currency_rates:
+        rates = CurrencyRates(path=None)
+        rates.load_file(args.currency_rates)
+    else:
+        # Курсы загружаются один раз до сбора, через тот же транспорт и кэш
+        rates = get_default_currency_rates(transport)
+
+    if args.preload_areas and "hh" in args.platforms:
+        preload_areas(cities, transport)
+
+    if args.incremental and not args.db:
+        print("Для инкрементальной синхронизации нужно указать --db", file=sys.stderr)
+        return 2
+
+    sink = storage = harvest = None
+    if args.db:
+        storage = SQLiteOperator(db_name=args.db)
+
+    if args.incremental:
+        syncer = IncrementalSync(storage, args.sync_state, transport=transport, rates=rates)
+
+        def harvest(platform, city_name, prof_name, _transport, max_pages, _rates):
+            report = syncer.sync(platform, city_name, prof_name, max_pages=max_pages)
+            print(f"{report.query_key}: загружено {report.fetched}, новых {len(report.added)}, "
+                  f"изменено {len(report.updated)}, удалено {len(report.removed)}",
+                  file=sys.stderr)
+            if report.full and not report.removal_checked:
+                print(f"{report.query_key}: выдача загружена не полностью (--max-pages или "
+                      f"ограничение глубины API), удаленные вакансии не определялись",
+                      file=sys.stderr)
+            return report.changed
+    elif storage is not None:
+        def sink(task, task_vacancies):
+            _, city_name, prof_name = task
+            storage.upsert(task_vacancies, city_name, prof_name)
+
+    harvester = BatchHarvester(cities, professions, args.platforms, args.workers,
+                               transport, args.max_pages, sink=sink, harvest=harvest,
+                               rates=rates)
+    output_name = args.output
+    if output_name is None and not args.incremental:
+        output_name = DEFAULT_OUTPUT
+    dedup = not args.no_dedup and len(args.platforms) > 1
+    # id вакансий запуска нужны, чтобы проверить на дубли их группы в базе
+    run_ids = []
+    vacancies = harvester.iter_vacancies()
+    if dedup and storage is not None:
+        vacancies = collect_ids(vacancies, run_ids)
+    # Вакансии пишутся по мере загрузки, весь результат в памяти не собирается
+    output = None
+    start = 0
+    if output_name is None:
+        # Инкрементальная синхронизация пишет изменения только в базу
+        saved = sum(1 for _ in vacancies)
+    elif output_name.endswith(".jsonl"):
+        output = JsonLinesOperator(file_name=output_name)
+        start = output.count()
+        saved = output.append(vacancies)
+    else:
+        output = JsonOperator(vacancies, output_name)
+        saved = output.save_to_json()
+    if dedup and output is not None:
+        merged = deduplicate_harvest(read_output(output, start), output, start)
+        saved -= merged
+        print(f"Объединено дублей с разных платформ: {merged}", file=sys.stderr)
+    if dedup and storage is not None:
+        merged = deduplicate_storage(storage, run_ids)
+        print(f"Объединено дублей с разных платформ в базе: {merged}", file=sys.stderr)
+    if storage is not None:
+        print(f"Вакансий в базе {args.db}: {storage.count()}", file=sys.stderr)
+        storage.close()
+    if output is not None:
+        print(f"Сохранено вакансий: {saved} в {output_name}", file=sys.stderr)
+    for (platform, city_name, prof_name), error in harvester.errors:
+        print(f"Ошибка {PLATFORMS[platform][0]} / {city_name} / {prof_name}: {error}",
+              file=sys.stderr)
+    return 1 if harvester.errors else 0
+
+
+def preload_areas(cities, transport):
+    """Загрузка справочника регионов HH до запуска потоков, если в кэше нет городов
+
+    Без справочника id каждого города ищется отдельным запросом к /suggests/areas.
+    """
+    engine = HHApiEngine("", "", transport=transport)
+    if all(engine.area_cache.get(city_name) is not None for city_name in cities):
+        return
+    try:
+        loaded = engine.preload_areas()
+    except ApiError as error:
+        print(f"Справочник регионов не загружен: {error}", file=sys.stderr)
+        return
+    print(f"Справочник регионов загружен, названий: {loaded}", file=sys.stderr)
+
+
+def collect_ids(vacancies, vacancy_ids):
+    """Передача вакансий дальше с запоминанием их id"""
+    for vacancy in vacancies:
+        vacancy_ids.append(vacancy.vacancy_id)
+        yield vacancy
+
+
+def read_output(output, start=0):
+    """Вакансии этого запуска из файла результата
+
+    В файл JSON Lines вакансии дописываются, поэтому читаются только записи
+    начиная со start.
+    """
+    if isinstance(output, JsonLinesOperator):
+        return list(output.iter_vacancies(start))
+    return output.get_json()
+
+
+def deduplicate_harvest(harvested, output, start=0):
+    """Объединение дублей среди вакансий запуска в файле результата
+
+    Для поиска дублей вакансии запуска держатся в памяти, при найденных дублях
+    файл JSON перезаписывается, а в JSON Lines заново пишутся записи запуска.
+    Возвращает количество объединенных вакансий.
+    """
+    deduplicated = VacancyDeduplicator().deduplicate(harvested)
+    if len(deduplicated) == len(harvested):
+        return 0
+    if isinstance(output, JsonLinesOperator):
+        output.truncate(start)
+        output.append(deduplicated)
+    else:
+        JsonOperator(deduplicated, output.file_name).save_to_json()
+    return len(harvested) - len(deduplicated)
+
+
+def deduplicate_storage(storage, vacancy_ids, chunk_size=SQLITE_MAX_PARAMS):
+    """Объединение дублей в базе в группах компании и города вакансий запуска
+
+    Группа проверяется целиком вместе с вакансиями прежних запусков, основной
+    становится вакансия, раньше попавшая в базу. Дубли не удаляются, а
+    помечаются id основной вакансии и скрываются из выборок, поэтому при
+    удалении основной вакансии снова становятся видны. В памяти держатся
+    вакансии chunk_size групп. Возвращает количество скрытых дублей.
+    """
+    deduplicator = VacancyDeduplicator()
+    keys = sorted(storage.dedup_keys(vacancy_ids))
+    merged = 0
+    for chunk_start in range(0, len(keys), chunk_size):
+        chunk = keys[chunk_start:chunk_start + chunk_size]
+        vacancies = list(storage.iter_vacancies_by_dedup_keys(chunk))
+        merged_into = {}
+        for group in deduplicator.find_groups(vacancies):
+            main_id = vacancies[group[0]].vacancy_id
+            for position in group[1:]:
+                merged_into[vacancies[position].vacancy_id] = main_id
+        storage.replace_merges(chunk, merged_into)
+        merged += len(merged_into)
+    return merged
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Пиковая память пути сбор -> валидация -> формат -> запись: списки против генераторов
+
+Запуск из корня проекта: python -m benchmarks.bench_pipeline_memory --count 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from hh_vac_getter import (hh_vac_info_validation, hh_data_formatting,
+                           iter_hh_vac_info_validation, iter_hh_data_formatting)
+from json_manager import JsonOperator
+from validation import SchemaValidator, HH_RULES
+from benchmarks.synthetic import iter_hh_items, synthetic_currency_rates
+
+RATES = synthetic_currency_rates()
+
+
+def run_list_pipeline(count, file_name):
+    """Прежний путь: каждый этап строит полный промежуточный список"""
+    vac_source = list(iter_hh_items(count))
+    valid = hh_vac_info_validation(vac_source, SchemaValidator(HH_RULES, RATES.multipliers))
+    formatted = hh_data_formatting(valid, RATES)
+    return JsonOperator(formatted, file_name).save_to_json()
+
+
+def run_stream_pipeline(count, file_name):
+    """Потоковый путь: вакансии проходят этапы по одной"""
+    valid = iter_hh_vac_info_validation(iter_hh_items(count),
+                                        SchemaValidator(HH_RULES, RATES.multipliers))
+    formatted = iter_hh_data_formatting(valid, RATES)
+    return JsonOperator(formatted, file_name).save_to_json()
+
+
+def measure(pipeline, count, file_name):
+    tracemalloc.start()
+    started = time.perf_counter()
+    saved = pipeline(count, file_name)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return saved, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, nargs="+", default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = os.path.join(tmp_dir, "vacancies.json")
+        print(f"{'вакансий':>10} {'путь':>8} {'записано':>10} {'время, с':>10} {'пик, МБ':>10}")
+        for count in args.count:
+            for name, pipeline in (("списки", run_list_pipeline),
+                                   ("поток", run_stream_pipeline)):
+                saved, elapsed, peak = measure(pipeline, count, file_name)
+                print(f"{count:>10} {name:>8} {saved:>10} {elapsed:>10.2f} "
+                      f"{peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
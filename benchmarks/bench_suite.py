@@ -0,0 +1,318 @@
+"""Бенчмарк всего пути: загрузка -> валидация -> форматирование -> JSON -> запросы
+
+Запуск из корня проекта:
+python -m benchmarks.bench_suite
+python -m benchmarks.bench_suite --sizes 100000 1000000 --stages validate_hh format_hh
+python -m benchmarks.bench_suite --save-baseline
+
+Каждый этап для каждого размера выполняется в отдельном процессе, поэтому
+пиковый RSS относится только к этому этапу и его входным данным. Движки
+работают с локальным сервером (benchmarks.stub_server), остальные этапы -
+с пулом из фикстур и синтетических вакансий, повторяемым до
+нужного размера. Результаты сравниваются с сохраненной базой: падение
+пропускной способности или рост пикового RSS больше --tolerance считается
+регрессией, код возврата при этом 1.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from area_cache import AreaCache
+from hh_vac_getter import (HHApiEngine, HH_MAX_DEPTH, hh_vac_info_validation,
+                           hh_data_formatting)
+from sj_vac_getter import (SJApiEngine, SJ_MAX_DEPTH, sj_vac_info_validation,
+                           sj_data_formatting)
+from http_transport import HttpTransport
+from json_manager import JsonOperator
+from validation import SchemaValidator, HH_RULES, SJ_RULES
+from vacancy_operator import VacancyOperator
+from benchmarks.recorded import load_hh_items, load_sj_items
+from benchmarks.stub_server import StubApiServer
+from benchmarks.synthetic import iter_hh_items, iter_sj_items, synthetic_currency_rates
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARKS_DIR)
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+POOL_SIZE = 10000  # Различных вакансий в пуле, дальше пул повторяется
+RATES = synthetic_currency_rates()
+
+
+def hh_pool():
+    """Вакансии фикстуры HeadHunter, дополненные синтетическими до POOL_SIZE"""
+    items = load_hh_items()
+    return items + list(iter_hh_items(POOL_SIZE - len(items)))
+
+
+def sj_pool():
+    """Вакансии фикстуры SuperJob, дополненные синтетическими до POOL_SIZE"""
+    items = load_sj_items()
+    return items + list(iter_sj_items(POOL_SIZE - len(items)))
+
+
+def repeat_pool(pool, count):
+    return [pool[number % len(pool)] for number in range(count)]
+
+
+def hh_vacancies(count):
+    valid = hh_vac_info_validation(repeat_pool(hh_pool(), count),
+                                   SchemaValidator(HH_RULES, RATES.multipliers))
+    return hh_data_formatting(valid, RATES)
+
+
+# Этапы: подготовка входных данных (не измеряется) и измеряемый запуск,
+# запуск возвращает количество обработанных вакансий
+def prepare_fetch_hh(count, stub_url, work_dir):
+    return HHApiEngine("Москва", "bench", hh_api_url=f"{stub_url}/hh/{count}",
+                       transport=HttpTransport(),
+                       area_cache=AreaCache(os.path.join(work_dir, "areas.json")))
+
+
+def run_fetch_hh(engine):
+    return len(engine.get_vacancies(all_pages=True))
+
+
+def prepare_fetch_sj(count, stub_url, work_dir):
+    return SJApiEngine("Москва", "bench", sj_api_url=f"{stub_url}/sj/{count}/2.0",
+                       transport=HttpTransport())
+
+
+def run_fetch_sj(engine):
+    return len(engine.get_vacancies(all_pages=True))
+
+
+def prepare_validate_hh(count, stub_url, work_dir):
+    return repeat_pool(hh_pool(), count)
+
+
+def run_validate_hh(items):
+    return len(hh_vac_info_validation(items, SchemaValidator(HH_RULES, RATES.multipliers)))
+
+
+def prepare_validate_sj(count, stub_url, work_dir):
+    return repeat_pool(sj_pool(), count)
+
+
+def run_validate_sj(items):
+    return len(sj_vac_info_validation(items, SchemaValidator(SJ_RULES, RATES.multipliers)))
+
+
+def prepare_format_hh(count, stub_url, work_dir):
+    return hh_vac_info_validation(repeat_pool(hh_pool(), count),
+                                  SchemaValidator(HH_RULES, RATES.multipliers))
+
+
+def run_format_hh(valid):
+    return len(hh_data_formatting(valid, RATES))
+
+
+def prepare_format_sj(count, stub_url, work_dir):
+    return sj_vac_info_validation(repeat_pool(sj_pool(), count),
+                                  SchemaValidator(SJ_RULES, RATES.multipliers))
+
+
+def run_format_sj(valid):
+    return len(sj_data_formatting(valid, RATES))
+
+
+def prepare_json_save(count, stub_url, work_dir):
+    return JsonOperator(hh_vacancies(count), os.path.join(work_dir, "vacancies.json"))
+
+
+def run_json_save(operator):
+    return operator.save_to_json()
+
+
+def prepare_json_load(count, stub_url, work_dir):
+    operator = JsonOperator(hh_vacancies(count), os.path.join(work_dir, "vacancies.json"))
+    operator.save_to_json()
+    return JsonOperator([], operator.file_name)
+
+
+def run_json_load(operator):
+    return len(operator.get_json())
+
+
+def prepare_query(count, stub_url, work_dir):
+    return hh_vacancies(count)
+
+
+def run_query(vacancies):
+    """Построение индексов и типовые запросы меню"""
+    operator = VacancyOperator(vacancies)
+    employer = vacancies[0].employer if vacancies else None
+    operator.get_vac_by_min_salary(150000)
+    operator.get_top_n_vacancies_by_sal(10)
+    operator.filter_vacancies(100000, 200000, employer, "RUR")
+    operator.get_vac_by_keyword("Python")
+    return len(vacancies)
+
+
+STAGES = {
+    "fetch_hh": (prepare_fetch_hh, run_fetch_hh),
+    "fetch_sj": (prepare_fetch_sj, run_fetch_sj),
+    "validate_hh": (prepare_validate_hh, run_validate_hh),
+    "validate_sj": (prepare_validate_sj, run_validate_sj),
+    "format_hh": (prepare_format_hh, run_format_hh),
+    "format_sj": (prepare_format_sj, run_format_sj),
+    "json_save": (prepare_json_save, run_json_save),
+    "json_load": (prepare_json_load, run_json_load),
+    "query": (prepare_query, run_query)
+}
+
+# Движки не получают больше вакансий, чем отдает API по одному запросу
+STAGE_LIMITS = {"fetch_hh": HH_MAX_DEPTH, "fetch_sj": SJ_MAX_DEPTH}
+
+
+def read_status_kb(field):
+    """Значение поля /proc/self/status в КБ, None вне Linux"""
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def reset_peak_rss():
+    """Сброс пикового RSS процесса (Linux), чтобы учесть только измеряемый этап"""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    peak_kb = read_status_kb("VmHWM")
+    if peak_kb is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # В macOS ru_maxrss в байтах, в Linux - в КБ
+        peak_kb = peak / 1024 if platform.system() == "Darwin" else peak
+    return peak_kb / 1024
+
+
+def run_stage(stage, count, stub_url, repeat):
+    """Измерение этапа в текущем процессе: лучшее время из repeat запусков"""
+    prepare, run = STAGES[stage]
+    with tempfile.TemporaryDirectory() as work_dir:
+        prepared = prepare(count, stub_url, work_dir)
+        reset_peak_rss()
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            processed = run(prepared)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return {
+            "processed": processed,
+            "seconds": best,
+            "throughput": processed / best if best else 0.0,
+            "peak_rss_mb": peak_rss_mb()
+        }
+
+
+def run_stage_process(stage, count, stub_url, repeat):
+    """Запуск этапа в отдельном процессе"""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite", "--worker", stage, str(count),
+         stub_url, str(repeat)],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Регрессии относительно базы: строки с описанием"""
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if result["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: пропускная способность {result['throughput']:.0f} "
+                               f"вместо {expected['throughput']:.0f} вак./с")
+        if result["peak_rss_mb"] > expected["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{key}: пиковый RSS {result['peak_rss_mb']:.1f} "
+                               f"вместо {expected['peak_rss_mb']:.1f} МБ")
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def save_baseline(path, results):
+    stored = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(stored, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Количество вакансий, до 1000000")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Сохранить результаты как новую базу")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Допустимое отклонение от базы, доля")
+    parser.add_argument("--worker", nargs=4, metavar=("STAGE", "COUNT", "URL", "REPEAT"),
+                        help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        stage, count, stub_url, repeat = args.worker
+        print(json.dumps(run_stage(stage, int(count), stub_url, int(repeat))))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    print(f"{'этап':>12} {'размер':>8} {'обработано':>11} {'время, с':>9} "
+          f"{'вак./с':>10} {'RSS, МБ':>8} {'к базе':>7}")
+    with StubApiServer(hh_pool(), sj_pool()) as server:
+        for size in args.sizes:
+            for stage in args.stages:
+                count = min(size, STAGE_LIMITS.get(stage, size))
+                key = f"{stage}/{count}"
+                if key in results:
+                    continue
+                result = run_stage_process(stage, count, server.url, args.repeat)
+                results[key] = result
+                ratio = ""
+                if key in baseline:
+                    ratio = f"{result['throughput'] / baseline[key]['throughput']:.2f}x"
+                print(f"{stage:>12} {count:>8} {result['processed']:>11} "
+                      f"{result['seconds']:>9.3f} {result['throughput']:>10.0f} "
+                      f"{result['peak_rss_mb']:>8.1f} {ratio:>7}", flush=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"База сохранена: {args.baseline}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Регрессия {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Сравнение индексированного VacancyOperator с прежними списковыми выражениями
+
+Запуск из корня проекта: python -m benchmarks.bench_vacancy_queries --count 300000
+"""
+import argparse
+import time
+from operator import attrgetter
+
+from hh_vac_getter import iter_hh_data_formatting
+from vacancy_operator import VacancyOperator
+from benchmarks.synthetic import iter_hh_items, synthetic_currency_rates
+
+
+def make_vacancies(count):
+    """Синтетические вакансии с заполненной зарплатой"""
+    items = iter_hh_items(count)
+    valid = (item for item in items if item["salary"]["from"] is not None)
+    return list(iter_hh_data_formatting(valid, synthetic_currency_rates()))
+
+
+class ListVacancyOperator:
+    """Прежняя реализация запросов: полный перебор и полная сортировка"""
+
+    def __init__(self, valid_vacancies_list):
+        self.valid_vacancies_list = valid_vacancies_list
+
+    def get_vac_by_min_salary(self, salary_minimum):
+        return [item for item in self.valid_vacancies_list if item.salary_from >= salary_minimum]
+
+    def get_top_n_vacancies_by_sal(self, vac_count):
+        return sorted(self.valid_vacancies_list, key=attrgetter("salary_from"),
+                      reverse=True)[:vac_count]
+
+    def filter_vacancies(self, salary_minimum, salary_maximum, employer, currency):
+        return [item for item in self.valid_vacancies_list
+                if salary_minimum <= item.salary_from <= salary_maximum
+                and item.employer == employer and item.currency == currency]
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    vacancies = make_vacancies(args.count)
+    employer = vacancies[0].employer
+
+    started = time.perf_counter()
+    indexed = VacancyOperator(vacancies)
+    print(f"Вакансий: {len(vacancies)}, построение индекса: "
+          f"{(time.perf_counter() - started) * 1000:.1f} мс")
+    legacy = ListVacancyOperator(vacancies)
+
+    queries = {
+        "мин. зарплата": lambda op: op.get_vac_by_min_salary(350000),
+        "топ 10": lambda op: op.get_top_n_vacancies_by_sal(10),
+        "диапазон+компания+валюта": lambda op: op.filter_vacancies(
+            100000, 200000, employer, "RUR")
+    }
+    print(f"{'запрос':>26} {'списки, мс':>12} {'индекс, мс':>12} {'ускорение':>10}")
+    for name, query in queries.items():
+        legacy_ms, legacy_result = timed(lambda: query(legacy), args.repeat)
+        indexed_ms, indexed_result = timed(lambda: query(indexed), args.repeat)
+        assert legacy_result == indexed_result
+        print(f"{name:>26} {legacy_ms:>12.2f} {indexed_ms:>12.2f} "
+              f"{legacy_ms / indexed_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Пропускная способность валидации: табличный SchemaValidator против прежних if-цепочек
+
+Запуск из корня проекта: python -m benchmarks.bench_validation --count 200000
+"""
+import argparse
+import time
+
+from currency_rates import CurrencyRates
+from validation import SchemaValidator, HH_RULES, SJ_RULES
+from benchmarks.synthetic import iter_hh_items, iter_sj_items
+
+
+def legacy_hh_vac_info_validation(hh_vac_source_list):
+    """Прежняя валидация HeadHunter (до табличных правил)"""
+    hh_valid_vacancies = []
+    for vacancies in hh_vac_source_list:
+        if isinstance(vacancies["name"], str):
+            vacancy_name = vacancies["name"]
+
+        if "https://" in vacancies["alternate_url"]:
+            url = vacancies["alternate_url"]
+
+        if vacancies["salary"] is not None:
+            if (isinstance(vacancies["salary"]["from"], int) and
+                    vacancies["salary"]["from"] > 0):
+                salary_from = vacancies["salary"]["from"]
+
+            else:
+                salary_from = False
+
+            if (isinstance(vacancies["salary"]["currency"], str) and
+                    vacancies["salary"]["currency"] == "RUR"):
+                salary_currency = vacancies["salary"]["currency"]
+
+            else:
+                salary_currency = False
+
+            if (isinstance(vacancies["salary"]["to"], int) and
+                    vacancies["salary"]["to"] > 0):
+                salary_to = vacancies["salary"]["to"]
+
+            else:
+                salary_to = False
+        else:
+            salary_from = salary_currency = salary_to = False
+
+        if isinstance(vacancies["employer"]["name"], str):
+            employer_name = vacancies["employer"]["name"]
+
+        if isinstance(vacancies["snippet"]["requirement"], str):
+            requirement = vacancies["snippet"]["requirement"]
+
+        if isinstance(vacancies["snippet"]["responsibility"], str):
+            responsibility = vacancies["snippet"]["responsibility"]
+
+        if (vacancy_name and url and salary_from and salary_currency and salary_to
+                and employer_name and requirement and responsibility):
+            hh_valid_vacancies.append(vacancies)
+    return hh_valid_vacancies
+
+
+def legacy_sj_vac_info_validation(sj_vac_source_list):
+    """Прежняя валидация SuperJob (до табличных правил)"""
+    hh_valid_vacancies = []
+    for vacancies in sj_vac_source_list:
+        if isinstance(vacancies["profession"], str):
+            vacancy_name = vacancies["profession"]
+
+        if "https://" in vacancies["link"]:
+            url = vacancies["link"]
+
+        if vacancies["payment_from"] is not None:
+            if (isinstance(vacancies["payment_from"], int) and
+                    vacancies["payment_from"] > 0):
+                salary_from = vacancies["payment_from"]
+
+            else:
+                salary_from = False
+
+            if (isinstance(vacancies["currency"], str) and
+                    vacancies["currency"] == "rub"):
+                salary_currency = vacancies["currency"]
+
+            else:
+                salary_currency = False
+
+            if (isinstance(vacancies["payment_to"], int) and
+                    vacancies["payment_to"] > 0):
+                salary_to = vacancies["payment_to"]
+
+            else:
+                salary_to = False
+        else:
+            salary_from = salary_currency = salary_to = False
+
+        if vacancies["client"] is not None:
+            if ("title" in vacancies["client"]
+                    and isinstance(vacancies["client"]["title"], str)):
+                employer_name = vacancies["client"]["title"]
+
+            else:
+                employer_name = False
+
+        if isinstance(vacancies["candidat"], str):
+            requirement = vacancies["candidat"]
+
+        if (vacancy_name and url and salary_from and salary_currency and salary_to
+                and employer_name and requirement):
+            hh_valid_vacancies.append(vacancies)
+    return hh_valid_vacancies
+
+
+def schema_validation(rules):
+    # Только рубли, как в прежней валидации, чтобы сравнивать одинаковую работу
+    currencies = CurrencyRates(path=None).multipliers
+
+    def validate(items):
+        # Тот же путь, что и при загрузке: пачки по странице, метрики раз за поток
+        return list(SchemaValidator(rules, currencies).iter_valid(items))
+    return validate
+
+
+def measure(validate, items, repeat):
+    """Лучшее время из repeat прогонов"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        accepted = validate(items)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(accepted), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = {
+        "HeadHunter": (list(iter_hh_items(args.count)), legacy_hh_vac_info_validation,
+                       schema_validation(HH_RULES)),
+        "SuperJob": (list(iter_sj_items(args.count)), legacy_sj_vac_info_validation,
+                     schema_validation(SJ_RULES))
+    }
+    print(f"{'платформа':>10} {'реализация':>12} {'принято':>9} {'записей/с':>12} "
+          f"{'ускорение':>10}")
+    for platform, (items, legacy, schema) in payloads.items():
+        legacy_elapsed = None
+        for name, validate in (("if-цепочки", legacy), ("схема", schema)):
+            accepted, elapsed = measure(validate, items, args.repeat)
+            legacy_elapsed = legacy_elapsed or elapsed
+            print(f"{platform:>10} {name:>12} {accepted:>9} {len(items) / elapsed:>12.0f} "
+                  f"{legacy_elapsed / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
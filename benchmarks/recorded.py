@@ -0,0 +1,58 @@
+"""Образцы ответов HeadHunter и SuperJob для бенчмарков
+
+Фикстуры в репозитории составлены вручную по формату API (несколько вакансий
+на платформу). Замена их первой страницей реальной выдачи (для SuperJob нужен
+SJ_TOKEN):
+python -m benchmarks.recorded --city Москва --profession "Python разработчик"
+"""
+import argparse
+import json
+import os
+
+from hh_vac_getter import HHApiEngine
+from sj_vac_getter import SJApiEngine
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HH_FIXTURE = os.path.join(FIXTURES_DIR, "hh_vacancies.json")
+SJ_FIXTURE = os.path.join(FIXTURES_DIR, "sj_vacancies.json")
+
+
+def load_fixture(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_hh_items():
+    """Вакансии из фикстуры страницы HeadHunter /vacancies"""
+    return load_fixture(HH_FIXTURE)["items"]
+
+
+def load_sj_items():
+    """Вакансии из фикстуры страницы SuperJob /vacancies"""
+    return load_fixture(SJ_FIXTURE)["objects"]
+
+
+def save_fixture(path, page):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(page, file, ensure_ascii=False, indent=2)
+
+
+def record(city_name, prof_name):
+    """Запись первой страницы выдачи обеих платформ в фикстуры"""
+    hh_engine = HHApiEngine(city_name, prof_name)
+    save_fixture(HH_FIXTURE, hh_engine._get_page(hh_engine.get_city_id(), 0))
+    sj_engine = SJApiEngine(city_name, prof_name)
+    save_fixture(SJ_FIXTURE, sj_engine._get_page(0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--city", default="Москва")
+    parser.add_argument("--profession", default="Python разработчик")
+    args = parser.parse_args()
+    record(args.city, args.profession)
+    print(f"Вакансий HeadHunter: {len(load_hh_items())}, SuperJob: {len(load_sj_items())}")
+
+
+if __name__ == "__main__":
+    main()
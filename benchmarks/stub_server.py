@@ -0,0 +1,112 @@
+"""Локальный сервер с API HeadHunter и SuperJob для бенчмарков движков
+
+Число вакансий в выдаче задается в пути: {url}/hh/{count} и {url}/sj/{count}/2.0
+подставляются вместо адресов API. Вакансии берутся по кругу из пула
+(фикстуры и синтетика), у каждой копии свой id.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.recorded import load_hh_items, load_sj_items
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        try:
+            platform, count, endpoint = parts[0], int(parts[1]), "/".join(parts[2:])
+        except (IndexError, ValueError):
+            return self.send_json(404, {"error": "not found"})
+
+        if platform == "hh" and endpoint == "vacancies":
+            body = self.server.hh_page(count, int(params.get("page", 0)),
+                                       int(params.get("per_page", 20)))
+        elif platform == "hh" and endpoint == "suggests/areas":
+            body = {"items": [{"id": "1", "text": params.get("text", "")}]}
+        elif platform == "hh" and endpoint == "areas":
+            body = self.server.areas
+        elif platform == "hh" and endpoint == "dictionaries":
+            body = {"currency": self.server.currencies}
+        elif platform == "sj" and endpoint == "2.0/vacancies":
+            body = self.server.sj_page(count, int(params.get("page", 0)),
+                                       int(params.get("count", 20)))
+        else:
+            return self.send_json(404, {"error": "not found"})
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubApiServer(ThreadingHTTPServer):
+    """Сервер выдачи вакансий из пулов hh_items и sj_items"""
+
+    daemon_threads = True
+
+    def __init__(self, hh_items, sj_items, host="127.0.0.1", port=0):
+        super().__init__((host, port), StubApiHandler)
+        self.hh_items = hh_items
+        self.sj_items = sj_items
+        self.currencies = [{"code": "RUR", "rate": 1.0}, {"code": "USD", "rate": 0.0108},
+                           {"code": "EUR", "rate": 0.0099}, {"code": "KZT", "rate": 4.9}]
+        self.areas = [{"id": "113", "name": "Россия", "areas": [
+            {"id": "1", "name": "Москва", "areas": []},
+            {"id": "88", "name": "Казань", "areas": []}]}]
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def hh_page(self, count, page, per_page):
+        start, end = page * per_page, min(count, (page + 1) * per_page)
+        items = [dict(self.hh_items[number % len(self.hh_items)], id=str(number))
+                 for number in range(start, end)]
+        return {"items": items, "found": count, "pages": -(-count // per_page),
+                "page": page, "per_page": per_page}
+
+    def sj_page(self, count, page, per_page):
+        start, end = page * per_page, min(count, (page + 1) * per_page)
+        objects = [dict(self.sj_items[number % len(self.sj_items)], id=number)
+                   for number in range(start, end)]
+        return {"objects": objects, "total": count, "more": end < count}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    server = StubApiServer(load_hh_items(), load_sj_items(), port=8765)
+    print(f"Сервер запущен: {server.url}/hh/<count>, {server.url}/sj/<count>/2.0")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Генератор синтетических ответов HeadHunter и SuperJob для бенчмарков"""
+import random
+
+from currency_rates import CurrencyRates
+
+WORDS = ["Python", "Django", "SQL", "Docker", "Linux", "Git", "REST", "API", "опыт",
+         "разработка", "тестирование", "сервисы", "команда", "знание", "английский",
+         "PostgreSQL", "Kafka", "Redis", "асинхронность", "архитектура"]
+EMPLOYERS = [f"Компания {number}" for number in range(500)]
+# Курсы в формате справочника HeadHunter: единиц валюты в одном рубле
+RATES = {"RUR": 1, "USD": 0.0108, "EUR": 0.0099}
+
+
+def _text(rnd, words_count):
+    return " ".join(rnd.choice(WORDS) for _ in range(words_count))
+
+
+def hh_item(number, rnd):
+    """Вакансия в формате ответа HeadHunter /vacancies"""
+    salary_from = rnd.randrange(20, 400) * 1000
+    return {
+        "id": str(number),
+        "name": f"Разработчик {_text(rnd, 2)}",
+        "alternate_url": f"https://hh.ru/vacancy/{number}",
+        "published_at": f"2024-01-{rnd.randrange(1, 29):02d}T10:00:00+0300",
+        "salary": {
+            "from": salary_from if rnd.random() > 0.1 else None,
+            "to": salary_from + rnd.randrange(0, 200) * 1000,
+            "currency": "RUR" if rnd.random() > 0.05 else "USD",
+            "gross": False
+        },
+        "employer": {"id": str(number % 500), "name": rnd.choice(EMPLOYERS)},
+        "snippet": {
+            "requirement": _text(rnd, 20),
+            "responsibility": _text(rnd, 20)
+        },
+        "area": {"id": "1", "name": "Москва"}
+    }
+
+
+def sj_item(number, rnd):
+    """Вакансия в формате ответа SuperJob /vacancies"""
+    payment_from = rnd.randrange(20, 400) * 1000
+    return {
+        "id": number,
+        "profession": f"Разработчик {_text(rnd, 2)}",
+        "link": f"https://www.superjob.ru/vakansii/{number}.html",
+        "date_published": 1700000000 + number,
+        "payment_from": payment_from if rnd.random() > 0.1 else 0,
+        "payment_to": payment_from + rnd.randrange(0, 200) * 1000,
+        "currency": "rub" if rnd.random() > 0.05 else "usd",
+        "client": {"id": number % 500, "title": rnd.choice(EMPLOYERS)},
+        "candidat": _text(rnd, 40),
+        "town": {"id": 4, "title": "Москва"}
+    }
+
+
+def iter_hh_items(count, seed=1):
+    """Генератор count синтетических вакансий HeadHunter"""
+    rnd = random.Random(seed)
+    for number in range(count):
+        yield hh_item(number, rnd)
+
+
+def iter_sj_items(count, seed=1):
+    """Генератор count синтетических вакансий SuperJob"""
+    rnd = random.Random(seed)
+    for number in range(count):
+        yield sj_item(number, rnd)
+
+
+def synthetic_currency_rates():
+    """Таблица курсов в памяти, без диска и сети"""
+    rates = CurrencyRates(path=None)
+    rates.set_rates(RATES, persist=False)
+    return rates
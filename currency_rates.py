@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+
+from http_transport import ApiError, get_default_transport
+
+CURRENCY_RATES_FILE = "currency_rates.json"
+CURRENCY_RATES_TTL = 24 * 60 * 60  # Курсы в справочнике HeadHunter обновляются раз в сутки
+BASE_CURRENCY = "RUR"
+# Коды валют, которые платформы пишут иначе, чем справочник HeadHunter
+CURRENCY_ALIASES = {"RUB": "RUR"}
+
+
+class CurrencyRates:
+    """Таблица курсов валют к базовой валюте (рублю) с кэшем на диске
+
+    Курсы хранятся как в справочнике HeadHunter /dictionaries: сколько единиц
+    валюты в одной единице базовой. Для перевода в памяти держится таблица
+    множителей по коду валюты в обоих регистрах (SuperJob пишет коды строчными),
+    поэтому перевод зарплаты - один поиск в словаре без обращения к диску.
+    """
+
+    def __init__(self, path=CURRENCY_RATES_FILE, ttl=CURRENCY_RATES_TTL,
+                 base_currency=BASE_CURRENCY):
+        self.path = path
+        self.ttl = ttl
+        self.base_currency = base_currency
+        self.rates = {}
+        self.saved_at = 0
+        # Таблица множителей меняется на месте, проверки валидатора видят обновления
+        self.multipliers = {}
+        self.refresh_failed = False
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.set_rates({base_currency: 1}, saved_at=0, persist=False)
+        self.load()
+
+    def load(self):
+        """Загрузка курсов с диска, устаревшие тоже загружаются как запасной вариант"""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                stored = json.load(file)
+            self.set_rates(stored["rates"], stored["saved_at"], persist=False)
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+    def save(self):
+        """Сохранение курсов на диск"""
+        if self.path is None:
+            return
+        with self.lock:
+            stored = {"saved_at": self.saved_at, "rates": self.rates}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(stored, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def is_fresh(self):
+        return time.time() - self.saved_at < self.ttl
+
+    def set_rates(self, rates, saved_at=None, persist=True):
+        """Замена таблицы курсов: код валюты - единиц валюты в базовой"""
+        rates = {code.upper(): float(rate) for code, rate in rates.items() if rate}
+        rates.setdefault(self.base_currency, 1.0)
+        multipliers = {}
+        for code, rate in rates.items():
+            multipliers[code] = multipliers[code.lower()] = 1 / rate
+        for alias, code in CURRENCY_ALIASES.items():
+            if code in rates:
+                multipliers[alias] = multipliers[alias.lower()] = 1 / rates[code]
+        with self.lock:
+            self.rates = rates
+            self.saved_at = time.time() if saved_at is None else saved_at
+            self.multipliers.clear()
+            self.multipliers.update(multipliers)
+        if persist:
+            self.save()
+        return len(rates)
+
+    def load_file(self, path):
+        """Загрузка курсов из локального файла
+
+        Файл - словарь {код валюты: курс} или сохраненный ответ /dictionaries.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if "currency" in data:
+            data = parse_dictionaries(data)
+        return self.set_rates(data)
+
+    def refresh(self, transport, hh_api_url="https://api.hh.ru", headers=None):
+        """Загрузка курсов из справочника HeadHunter /dictionaries"""
+        dictionaries = transport.get_json(hh_api_url + "/dictionaries", headers=headers)
+        return self.set_rates(parse_dictionaries(dictionaries))
+
+    def ensure_fresh(self, transport=None):
+        """Обновление устаревших курсов, при ошибке остаются сохраненные
+
+        Неудачная попытка не повторяется до перезапуска программы.
+        """
+        if self.is_fresh() or self.refresh_failed:
+            return
+        with self.refresh_lock:
+            if self.is_fresh() or self.refresh_failed:
+                return
+            try:
+                self.refresh(transport or get_default_transport())
+            except (ApiError, KeyError, TypeError, ValueError):
+                self.refresh_failed = True
+
+    def convert(self, amount, currency):
+        """Сумма в базовой валюте, None если сумма не указана или курс неизвестен"""
+        multiplier = self.multipliers.get(currency)
+        if not amount or multiplier is None:
+            return None
+        return round(amount * multiplier)
+
+
+def parse_dictionaries(dictionaries):
+    """Курсы валют из ответа /dictionaries HeadHunter"""
+    return {item["code"]: item["rate"] for item in dictionaries["currency"]}
+
+
+_default_currency_rates = None
+_default_currency_rates_lock = threading.Lock()
+
+
+def get_default_currency_rates(transport=None):
+    """Общий экземпляр таблицы курсов, устаревшие курсы обновляются"""
+    global _default_currency_rates
+    with _default_currency_rates_lock:
+        if _default_currency_rates is None:
+            _default_currency_rates = CurrencyRates()
+        rates = _default_currency_rates
+    rates.ensure_fresh(transport)
+    return rates
+
+
+def set_default_currency_rates(rates):
+    """Замена общей таблицы курсов, например на загруженную из файла"""
+    global _default_currency_rates
+    with _default_currency_rates_lock:
+        _default_currency_rates = rates
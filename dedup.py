@@ -0,0 +1,214 @@
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import replace
+
+from area_cache import normalize_city_name
+from text_index import tokenize
+
+LEGAL_FORMS_RE = re.compile(r"\b(ооо|оао|зао|пао|ао|ип|нко|гк|llc|ltd|inc|gmbh)\b")
+NON_WORD_RE = re.compile(r"[^0-9a-zа-я]+")
+
+
+def normalize_employer(employer_name):
+    """Название компании без регистра, кавычек и организационно-правовой формы"""
+    name = (employer_name or "").lower().replace("ё", "е")
+    name = LEGAL_FORMS_RE.sub(" ", name)
+    return NON_WORD_RE.sub("", name)
+
+
+def dedup_key(employer_name, city):
+    """Ключ группы, в которой ищутся дубли: компания и город, None без компании"""
+    employer = normalize_employer(employer_name)
+    if not employer:
+        return None
+    return f"{employer}|{normalize_city_name(city)}"
+
+
+def shingles(text):
+    """Множество слов и пар соседних слов текста после стемминга"""
+    tokens = tokenize(text or "")
+    return set(tokens) | {f"{first} {second}" for first, second in zip(tokens, tokens[1:])}
+
+
+def jaccard(first, second):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def salaries_match(first, second, tolerance):
+    """Зарплаты совпадают с точностью tolerance, неуказанные границы не сравниваются"""
+    for first_value, second_value in ((first.salary_from, second.salary_from),
+                                      (first.salary_to, second.salary_to)):
+        if first_value and second_value:
+            if abs(first_value - second_value) > tolerance * max(first_value, second_value):
+                return False
+    return True
+
+
+class MinHasher:
+    """Сигнатуры MinHash для оценки сходства множеств по Жаккару
+
+    Используется вариант с одной хэш-функцией (one permutation hashing):
+    хэши элементов раскладываются по num_perm корзинам, в каждой берется
+    минимум, пустые корзины заполняются значением следующей непустой.
+    Так сигнатура строится за один проход по элементам множества.
+    """
+
+    def __init__(self, num_perm=32, seed=1):
+        self.num_perm = num_perm
+        self.seed = seed
+
+    def signature(self, items):
+        bins = [None] * self.num_perm
+        for item in items:
+            value = zlib.crc32(item.encode("utf-8"), self.seed)
+            bin_number, bin_value = value % self.num_perm, value // self.num_perm
+            if bins[bin_number] is None or bin_value < bins[bin_number]:
+                bins[bin_number] = bin_value
+        if all(value is None for value in bins):
+            return tuple(bins)
+        for bin_number in range(self.num_perm):
+            offset = 0
+            while bins[(bin_number + offset) % self.num_perm] is None:
+                offset += 1
+            if offset:
+                bins[bin_number] = (offset, bins[(bin_number + offset) % self.num_perm])
+        return tuple(bins)
+
+
+class VacancyDeduplicator:
+    """Поиск одной и той же вакансии, опубликованной на HeadHunter и SuperJob
+
+    Вакансии группируются по нормализованному названию компании и городу,
+    внутри группы кандидаты в дубли находятся через LSH по сигнатурам
+    MinHash текста требований, поэтому все пары вакансий не сравниваются.
+    Корзины LSH больше max_bucket_size (одинаковые шаблонные вакансии
+    сетевых компаний) пропускаются: по тексту в них дубль не отличить.
+    Кандидаты проверяются по сходству названия, зарплате и тексту, затем
+    пары объединяются от самых похожих, и при cross_platform_only в группе
+    остается не больше одной вакансии с каждой платформы.
+    Объединенная вакансия хранит ссылки на все платформы.
+    """
+
+    def __init__(self, title_threshold=0.5, text_threshold=0.4, salary_tolerance=0.1,
+                 num_perm=32, bands=16, cross_platform_only=True, max_bucket_size=50):
+        self.title_threshold = title_threshold
+        self.text_threshold = text_threshold
+        self.salary_tolerance = salary_tolerance
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.cross_platform_only = cross_platform_only
+        self.max_bucket_size = max_bucket_size
+        self.hasher = MinHasher(num_perm)
+
+    def deduplicate(self, vacancies):
+        """Список вакансий без дублей, порядок первых вхождений сохраняется"""
+        vacancies = list(vacancies)
+        return [merge_vacancies([vacancies[position] for position in group])
+                for group in self.find_groups(vacancies)]
+
+    def find_groups(self, vacancies):
+        """Группы позиций дублей в порядке первых вхождений, первой идет основная вакансия"""
+        parents = list(range(len(vacancies)))
+        sources = [{vacancy.source} for vacancy in vacancies]
+
+        def find(position):
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+            return position
+
+        pairs = sorted(self.find_duplicate_pairs(vacancies),
+                       key=lambda pair: (-pair[0], pair[1], pair[2]))
+        for _, first, second in pairs:
+            first_root, second_root = find(first), find(second)
+            if first_root == second_root:
+                continue
+            if self.cross_platform_only and sources[first_root] & sources[second_root]:
+                # С этой платформы в группе уже есть вакансия
+                continue
+            root, child = min(first_root, second_root), max(first_root, second_root)
+            parents[child] = root
+            sources[root] |= sources[child]
+
+        groups = defaultdict(list)
+        for position in range(len(vacancies)):
+            groups[find(position)].append(position)
+        return [groups[root] for root in sorted(groups)]
+
+    def find_duplicate_pairs(self, vacancies):
+        """Пары позиций вакансий, признанных дублями, со степенью сходства
+
+        Возвращает список (сходство, первая позиция, вторая позиция).
+        """
+        blocks = defaultdict(list)
+        for position, vacancy in enumerate(vacancies):
+            key = dedup_key(vacancy.employer, vacancy.city)
+            if key is not None:
+                blocks[key].append(position)
+
+        pairs = []
+        for positions in blocks.values():
+            if len(positions) < 2:
+                continue
+            if (self.cross_platform_only
+                    and len({vacancies[position].source for position in positions}) < 2):
+                continue
+            pairs.extend(self._block_pairs(vacancies, positions))
+        return pairs
+
+    def _block_pairs(self, vacancies, positions):
+        """Проверенные пары внутри группы одной компании в одном городе"""
+        texts = {position: shingles(vacancies[position].description) for position in positions}
+        signatures = {position: self.hasher.signature(texts[position]) for position in positions}
+
+        buckets = defaultdict(list)
+        for position in positions:
+            signature = signatures[position]
+            for band in range(self.bands):
+                band_key = signature[band * self.rows:(band + 1) * self.rows]
+                buckets[(band, band_key)].append(position)
+
+        candidates = set()
+        for bucket in buckets.values():
+            if len(bucket) > self.max_bucket_size:
+                continue
+            for index, first in enumerate(bucket):
+                for second in bucket[index + 1:]:
+                    if (self.cross_platform_only
+                            and vacancies[first].source == vacancies[second].source):
+                        continue
+                    candidates.add((min(first, second), max(first, second)))
+
+        titles = {}
+        pairs = []
+        for first, second in candidates:
+            first_vacancy, second_vacancy = vacancies[first], vacancies[second]
+            if not salaries_match(first_vacancy, second_vacancy, self.salary_tolerance):
+                continue
+            for position in (first, second):
+                if position not in titles:
+                    titles[position] = set(tokenize(vacancies[position].name))
+            title_similarity = jaccard(titles[first], titles[second])
+            if title_similarity < self.title_threshold:
+                continue
+            text_similarity = jaccard(texts[first], texts[second])
+            if text_similarity < self.text_threshold:
+                continue
+            pairs.append((title_similarity + text_similarity, first, second))
+        return pairs
+
+
+def merge_vacancies(members):
+    """Объединение дублей: первая вакансия со ссылками остальных"""
+    main = members[0]
+    if len(members) == 1:
+        return main
+    extra_urls = list(main.extra_urls)
+    for vacancy in members[1:]:
+        for url in (vacancy.url, *vacancy.extra_urls):
+            if url != main.url and url not in extra_urls:
+                extra_urls.append(url)
+    return replace(main, extra_urls=tuple(extra_urls))
@@ -1,113 +1,175 @@
-import requests
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from abstract_classes import ApiEngine
+from metrics import registry
+from area_cache import get_default_area_cache, normalize_city_name
+from vacancy import Vacancy, make_vacancy_id
+from validation import SchemaValidator, HH_RULES
+
+HH_PER_PAGE = 100
+HH_MAX_DEPTH = 2000  # HeadHunter не отдает больше 2000 вакансий по одному запросу
 
 
 class HHApiEngine(ApiEngine):
     """Класс для получения вакансий по API"""
 
-    def __init__(self, city_name, prof_name):
-        self.hh_api_url = "https://api.hh.ru"
+    def __init__(self, city_name, prof_name, hh_api_url="https://api.hh.ru", transport=None,
+                 area_cache=None, date_from=None):
+        super().__init__(transport)
+        self.area_cache = area_cache or get_default_area_cache()
+        self.hh_api_url = hh_api_url
         self.headers = {
             "User-Agent": "ViktorDavydov"
         }
         self.city_name = city_name
         self.prof_name = prof_name
+        # Загружать только вакансии, опубликованные не раньше date_from (ISO 8601)
+        self.date_from = date_from
+        # Последний iter_vacancies получил всю выдачу, без обрезки по страницам и глубине
+        self.fetched_all = False
 
     def __repr__(self):
         return (f"Указанный город: {self.city_name}"
                 f"Указанная профессия: {self.prof_name}")
 
+    @registry.timed("get_city_id", platform="hh")
     def get_city_id(self):
         """Получение id города для получения в нем вакансий"""
+        area_id = self.area_cache.get(self.city_name)
+        if area_id is not None:
+            return area_id
+
         params = {
             "text": self.city_name
         }
         hh_areas_url = self.hh_api_url + "/suggests/areas"
-        response = requests.get(hh_areas_url, params=params, headers=self.headers)
+        areas = self.transport.get_json(hh_areas_url, params=params, headers=self.headers)
 
-        for city in response.json()["items"]:
-            if city["text"] == self.city_name:
+        city_name = normalize_city_name(self.city_name)
+        for city in areas["items"]:
+            if normalize_city_name(city["text"]) == city_name:
+                self.area_cache.set(self.city_name, city["id"])
                 return city["id"]
 
-    def get_vacancies(self):
-        """Получение всех вакансий выбранного города"""
+    def preload_areas(self):
+        """Загрузка всего справочника регионов HH в кэш"""
+        return self.area_cache.preload(self.transport, self.hh_api_url, self.headers)
+
+    @registry.timed("get_vacancies", platform="hh")
+    def get_vacancies(self, all_pages=False, max_pages=None, max_workers=8):
+        """Получение всех вакансий выбранного города
+
+        При all_pages=True первая страница определяет общее число страниц,
+        остальные загружаются параллельно, порядок страниц сохраняется.
+        max_pages ограничивает общее количество загружаемых страниц.
+        """
+        if not all_pages:
+            return self._get_page(self.get_city_id(), 0)["items"]
+        return list(self.iter_vacancies(max_pages, max_workers))
+
+    def iter_vacancies(self, max_pages=None, max_workers=8):
+        """Генератор вакансий всех страниц по одной, в порядке страниц
+
+        Вперед загружается не больше max_workers страниц, поэтому в памяти
+        одновременно находится ограниченное число страниц. После загрузки
+        всех страниц fetched_all показывает, что выдача не была обрезана.
+        """
+        self.fetched_all = False
+        area = self.get_city_id()
+        first_page = self._get_page(area, 0)
+        pages_found = first_page.get("pages", 1)
+        pages_total = min(pages_found, HH_MAX_DEPTH // HH_PER_PAGE)
+        if max_pages is not None:
+            pages_total = min(pages_total, max_pages)
+        complete = pages_total >= pages_found and first_page.get("found", 0) <= HH_MAX_DEPTH
+        yield from first_page["items"]
+        del first_page
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            next_page = 1
+            while next_page < pages_total or pending:
+                while next_page < pages_total and len(pending) < max_workers:
+                    pending.append(executor.submit(self._get_page, area, next_page))
+                    next_page += 1
+                yield from pending.popleft().result()["items"]
+        self.fetched_all = complete
+
+    @registry.timed("get_page", platform="hh")
+    def _get_page(self, area, page):
+        """Получение одной страницы выдачи вакансий"""
         hh_vac_url = self.hh_api_url + "/vacancies"
         params = {
             "text": self.prof_name,
-            "per_page": 100,
-            "area": self.get_city_id()
+            "per_page": HH_PER_PAGE,
+            "page": page,
+            "area": area
         }
-        response = requests.get(hh_vac_url, params=params, headers=self.headers)
-
-        if response.status_code == 200:
-            vacancies = response.json()
+        if self.date_from is not None:
+            params["date_from"] = self.date_from
+        return self.transport.get_json(hh_vac_url, params=params, headers=self.headers)
 
-        return vacancies["items"]
 
-
-def hh_vac_info_validation(hh_vac_source_list):
+def hh_vac_info_validation(hh_vac_source_list, validator=None, rates=None):
     """Проверка входящих данных на корректность"""
-    hh_valid_vacancies = []
-    for vacancies in hh_vac_source_list:
-        if isinstance(vacancies["name"], str):
-            vacancy_name = vacancies["name"]
-
-        if "https://" in vacancies["alternate_url"]:
-            url = vacancies["alternate_url"]
-
-        if vacancies["salary"] is not None:
-            if (isinstance(vacancies["salary"]["from"], int) and
-                    vacancies["salary"]["from"] > 0):
-                salary_from = vacancies["salary"]["from"]
-
-            else:
-                salary_from = False
+    return list(iter_hh_vac_info_validation(hh_vac_source_list, validator, rates))
 
-            if (isinstance(vacancies["salary"]["currency"], str) and
-                    vacancies["salary"]["currency"] == "RUR"):
-                salary_currency = vacancies["salary"]["currency"]
 
-            else:
-                salary_currency = False
+def iter_hh_vac_info_validation(hh_vac_source_list, validator=None, rates=None):
+    """Проверка входящих данных на корректность пачками по странице
 
-            if (isinstance(vacancies["salary"]["to"], int) and
-                    vacancies["salary"]["to"] > 0):
-                salary_to = vacancies["salary"]["to"]
+    Счетчики отклоненных вакансий по правилам накапливаются в validator.
+    Без validator он создается по таблице курсов rates.
+    """
+    validator = validator or SchemaValidator(
+        HH_RULES, None if rates is None else rates.multipliers, name="hh")
+    return validator.iter_valid(hh_vac_source_list)
 
-            else:
-                salary_to = False
-        else:
-            salary_from = salary_currency = salary_to = False
 
-        if isinstance(vacancies["employer"]["name"], str):
-            employer_name = vacancies["employer"]["name"]
-
-        if isinstance(vacancies["snippet"]["requirement"], str):
-            requirement = vacancies["snippet"]["requirement"]
-
-        if isinstance(vacancies["snippet"]["responsibility"], str):
-            responsibility = vacancies["snippet"]["responsibility"]
-
-        if (vacancy_name and url and salary_from and salary_currency and salary_to
-                and employer_name and requirement and responsibility):
-            hh_valid_vacancies.append(vacancies)
-    return hh_valid_vacancies
-
-
-def hh_data_formatting(hh_vac_valid_list):
+def hh_data_formatting(hh_vac_valid_list, rates):
     """Метод для преобразования json формата в читабельный формат"""
-    hh_formed_vac = []
-    for vacancy in hh_vac_valid_list:
-        vacancies_items = {
-            "Наименование вакансии": vacancy["name"],
-            "Ссылка на вакансию": vacancy["alternate_url"],
-            "Зарплата от": vacancy["salary"]["from"],
-            "Зарплата до": vacancy["salary"]["to"],
-            "Валюта": vacancy["salary"]["currency"],
-            "Название компании": vacancy["employer"]["name"],
-            "Требования и обязанности": f"""{vacancy["snippet"]["requirement"]}
-{vacancy["snippet"]["responsibility"]}"""
-        }
-
-        hh_formed_vac.append(vacancies_items)
-    return hh_formed_vac
+    return list(iter_hh_data_formatting(hh_vac_valid_list, rates))
+
+
+def iter_hh_data_formatting(hh_vac_valid_list, rates):
+    """Преобразование в читабельный формат по одной вакансии
+
+    Зарплаты переводятся в базовую валюту по таблице курсов rates,
+    загруженной до начала обработки.
+    """
+    multipliers = rates.multipliers
+    base_currency = rates.base_currency
+    elapsed = 0.0
+    count = 0
+    try:
+        for vacancy in hh_vac_valid_list:
+            started = time.perf_counter()
+            salary = vacancy["salary"]
+            salary_from, salary_to = salary.get("from"), salary.get("to")
+            currency = salary["currency"]
+            multiplier = multipliers.get(currency)
+            if multiplier is not None:
+                salary_from = round(salary_from * multiplier) if salary_from else None
+                salary_to = round(salary_to * multiplier) if salary_to else None
+                currency = base_currency
+            vacancies_items = Vacancy(
+                name=vacancy["name"],
+                url=vacancy["alternate_url"],
+                salary_from=salary_from or None,
+                salary_to=salary_to or None,
+                currency=currency,
+                employer=vacancy["employer"]["name"],
+                description=f"""{vacancy["snippet"]["requirement"]}
+{vacancy["snippet"]["responsibility"]}""",
+                source="hh",
+                vacancy_id=make_vacancy_id("hh", vacancy["id"]),
+                city=(vacancy.get("area") or {}).get("name") or ""
+            )
+            elapsed += time.perf_counter() - started
+            count += 1
+            yield vacancies_items
+    finally:
+        # Учитывается только время преобразования, без ожидания источника
+        registry.observe_stage("formatting", elapsed, count, platform="hh")
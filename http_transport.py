@@ -0,0 +1,231 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import registry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Запросов в секунду для каждого хоста API
+DEFAULT_RATE_LIMITS = {
+    "api.hh.ru": 10,
+    "api.superjob.ru": 5
+}
+
+
+class ApiError(Exception):
+    """Ошибка обращения к API после исчерпания всех попыток"""
+
+    def __init__(self, url, status_code=None, message=""):
+        self.url = url
+        self.status_code = status_code
+        super().__init__(f"Ошибка запроса {url}: {status_code or message}")
+
+
+def parse_json(url, response):
+    """Разбор тела ответа, ответ не в формате JSON считается ошибкой API"""
+    try:
+        return response.json()
+    except ValueError:
+        raise ApiError(url, message="ответ не в формате JSON") from None
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов по алгоритму token bucket"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Ожидание свободного токена, возвращает время ожидания в секундах"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class HttpTransport:
+    """Общий транспорт для API: пул соединений, повторы и ограничение частоты"""
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30,
+                 rate_limits=None, pool_size=20, timeout=10, cache=None, max_concurrency=None):
+        self.cache = cache
+        # Общий предел одновременных запросов для всех потоков, использующих транспорт
+        self.concurrency = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_json(self, url, params=None, headers=None):
+        """GET запрос с повторами, возвращает разобранный json
+
+        Если подключен кэш, свежие ответы берутся из него, а устаревшие
+        проверяются условным запросом (If-None-Match/If-Modified-Since).
+        """
+        if self.cache is None:
+            return parse_json(url, self.get(url, params, headers))
+
+        key = self.cache.make_key(url, params)
+        entry = self.cache.get(key)
+        if self.cache.offline:
+            data = None if entry is None else self.cache.get_data(key)
+            if data is None:
+                registry.inc("http_cache_total", result="offline_miss")
+                raise ApiError(url, message="нет сохраненного ответа для offline режима")
+            registry.inc("http_cache_total", result="offline_hit")
+            return data
+        if entry is not None and self.cache.is_fresh(entry):
+            data = self.cache.get_data(key)
+            if data is not None:
+                registry.inc("http_cache_total", result="hit")
+                return data
+            entry = None
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(self.cache.conditional_headers(entry))
+        response = self.get(url, params, request_headers)
+        if response.status_code == 304 and entry is not None:
+            data = self.cache.refresh(key)
+            if data is not None:
+                registry.inc("http_cache_total", result="revalidated")
+                return data
+            # Файл записи пропал после условного запроса, повтор без валидаторов
+            response = self.get(url, params, headers)
+        registry.inc("http_cache_total", result="miss")
+        data = parse_json(url, response)
+        self.cache.put(key, url, params, data, response.headers)
+        return data
+
+    def get(self, url, params=None, headers=None):
+        """GET запрос с повторами при 429/5xx и сетевых ошибках"""
+        host = urlparse(url).hostname
+        bucket = self._get_bucket(url)
+        attempt = 0
+        while True:
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited:
+                    registry.inc("http_rate_limit_waits_total", host=host)
+                    registry.inc("http_rate_limit_wait_seconds_total", waited, host=host)
+            try:
+                response = self._send(url, params, headers)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt >= self.max_retries:
+                    raise ApiError(url, message=str(error)) from error
+                registry.inc("http_retries_total", host=host, reason=type(error).__name__)
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                registry.inc("http_retries_total", host=host, reason=str(response.status_code))
+                self._sleep_before_retry(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+                continue
+
+            if response.status_code >= 400:
+                raise ApiError(url, response.status_code)
+            return response
+
+    def _send(self, url, params, headers):
+        """Отправка запроса с учетом общего предела одновременных запросов"""
+        if self.concurrency is None:
+            return self._send_measured(url, params, headers)
+        with self.concurrency:
+            return self._send_measured(url, params, headers)
+
+    def _send_measured(self, url, params, headers):
+        """Отправка запроса с учетом времени ответа, кода и объема в метриках"""
+        host = urlparse(url).hostname
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, headers=headers,
+                                        timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            registry.inc("http_requests_total", host=host, status="error")
+            raise
+        registry.observe("http_request_duration_seconds", time.perf_counter() - started,
+                         host=host)
+        registry.inc("http_requests_total", host=host, status=str(response.status_code))
+        registry.inc("http_response_bytes_total", len(response.content), host=host)
+        return response
+
+    def _get_bucket(self, url):
+        """Получение ограничителя для хоста запроса"""
+        host = urlparse(url).hostname
+        rate = self.rate_limits.get(host)
+        if rate is None:
+            return None
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(rate)
+            return self.buckets[host]
+
+    def _sleep_before_retry(self, attempt, retry_after=None):
+        """Пауза перед повтором: Retry-After или экспоненциальная задержка"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_factor * (2 ** attempt)
+        time.sleep(min(delay, self.max_backoff))
+
+
+def parse_retry_after(value):
+    """Разбор заголовка Retry-After (секунды или HTTP дата)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """Общий для всех движков экземпляр транспорта"""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
+
+
+def set_default_transport(transport):
+    """Замена общего транспорта, например на транспорт с кэшем ответов"""
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from hh_vac_getter import HHApiEngine, iter_hh_vac_info_validation, iter_hh_data_formatting
+from sj_vac_getter import SJApiEngine, iter_sj_vac_info_validation, iter_sj_data_formatting
+from vacancy import JSON_KEYS, make_vacancy_id
+
+SYNC_STATE_FILE = "sync_state.json"
+FULL_SYNC_EVERY = 24  # Полная синхронизация для поиска удаленных вакансий
+
+
+def hh_published_at(item):
+    """Время публикации вакансии HeadHunter в unix time"""
+    return datetime.strptime(item["published_at"], "%Y-%m-%dT%H:%M:%S%z").timestamp()
+
+
+def hh_date_from(watermark):
+    """Параметр date_from HeadHunter из unix time"""
+    return datetime.fromtimestamp(watermark, timezone.utc).isoformat(timespec="seconds")
+
+
+def hh_source_salary(item):
+    """Зарплата вакансии HeadHunter до перевода в базовую валюту"""
+    salary = item.get("salary") or {}
+    return [salary.get("from"), salary.get("to"), salary.get("currency")]
+
+
+def sj_published_at(item):
+    """Время публикации вакансии SuperJob в unix time"""
+    return item["date_published"]
+
+
+def sj_date_from(watermark):
+    """Параметр date_published_from SuperJob из unix time"""
+    return int(watermark)
+
+
+def sj_source_salary(item):
+    """Зарплата вакансии SuperJob до перевода в базовую валюту"""
+    return [item.get("payment_from"), item.get("payment_to"), item.get("currency")]
+
+
+SYNC_PLATFORMS = {
+    "hh": (HHApiEngine, iter_hh_vac_info_validation, iter_hh_data_formatting,
+           hh_published_at, hh_date_from, hh_source_salary),
+    "sj": (SJApiEngine, iter_sj_vac_info_validation, iter_sj_data_formatting,
+           sj_published_at, sj_date_from, sj_source_salary)
+}
+
+
+def vacancy_fingerprint(vacancy, source_salary=None):
+    """Отпечаток содержимого вакансии для обнаружения изменений
+
+    source_salary - зарплата и валюта до перевода по курсу: с ней отпечаток
+    не меняется при обновлении курсов валют.
+    """
+    vacancy_info = vacancy.to_dict()
+    if source_salary is not None:
+        for field in ("salary_from", "salary_to", "currency"):
+            del vacancy_info[JSON_KEYS[field]]
+        vacancy_info["source_salary"] = source_salary
+    dumped = json.dumps(vacancy_info, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(dumped.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SyncReport:
+    """Результат синхронизации одного запроса"""
+    query_key: str
+    full: bool
+    fetched: int = 0
+    added: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    # Удаленные ищутся только по полной выдаче, обрезанной max_pages или глубиной API
+    removal_checked: bool = False
+
+    @property
+    def changed(self):
+        """Добавленные и измененные вакансии"""
+        return self.added + self.updated
+
+
+class IncrementalSync:
+    """Инкрементальная синхронизация: загружаются только вакансии новее отметки
+
+    Для каждого запроса (платформа, город, профессия) хранится отметка
+    времени последней опубликованной вакансии и отпечатки известных вакансий.
+    Новые и измененные вакансии записываются в хранилище (SQLiteOperator).
+    Удаленные вакансии обнаруживаются при полной синхронизации, которая
+    выполняется при первом запуске и затем раз в full_sync_every запусков,
+    если выдача получена целиком: без ограничения max_pages и не глубже,
+    чем отдает API.
+    """
+
+    def __init__(self, storage, state_file=SYNC_STATE_FILE, full_sync_every=FULL_SYNC_EVERY,
+                 transport=None, rates=None):
+        self.storage = storage
+        self.state_file = state_file
+        self.full_sync_every = full_sync_every
+        self.transport = transport
+        # Таблица курсов валют для проверки и перевода зарплат, загружается заранее
+        self.rates = rates
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(state_file):
+            with open(state_file, "r", encoding="utf-8") as file:
+                self.state = json.load(file)
+
+    @staticmethod
+    def query_key(platform, city_name, prof_name):
+        return f"{platform}|{city_name}|{prof_name}"
+
+    def sync(self, platform, city_name, prof_name, full=False, max_pages=None):
+        """Синхронизация одного запроса, возвращает SyncReport"""
+        (engine_class, validation, formatting, published_at, date_from,
+         source_salary) = SYNC_PLATFORMS[platform]
+        key = self.query_key(platform, city_name, prof_name)
+        with self.lock:
+            query_state = dict(self.state.get(key) or {"watermark": None, "runs": 0,
+                                                       "fingerprints": {}})
+        full = (full or query_state["watermark"] is None
+                or query_state["runs"] >= self.full_sync_every)
+
+        engine = engine_class(city_name, prof_name, transport=self.transport)
+        if not full:
+            engine.date_from = date_from(query_state["watermark"])
+
+        report = SyncReport(key, full)
+        watermark = query_state["watermark"]
+        # Зарплаты до перевода по курсу, забираются при расчете отпечатка
+        source_salaries = {}
+
+        def track(items):
+            nonlocal watermark
+            for item in items:
+                report.fetched += 1
+                item_time = published_at(item)
+                if watermark is None or item_time > watermark:
+                    watermark = item_time
+                source_salaries[make_vacancy_id(platform, item.get("id"))] = source_salary(item)
+                yield item
+
+        known = query_state["fingerprints"]
+        fingerprints = {} if full else dict(known)
+        vacancies = validation(track(engine.iter_vacancies(max_pages)), rates=self.rates)
+        for vacancy in formatting(vacancies, self.rates):
+            fingerprint = vacancy_fingerprint(vacancy,
+                                              source_salaries.pop(vacancy.vacancy_id, None))
+            previous = known.get(vacancy.vacancy_id)
+            if previous is None:
+                report.added.append(vacancy)
+            elif previous != fingerprint:
+                report.updated.append(vacancy)
+            fingerprints[vacancy.vacancy_id] = fingerprint
+
+        if full and engine.fetched_all:
+            # Вакансии, пропавшие из полной выдачи или ставшие некорректными
+            report.removed = [vacancy_id for vacancy_id in known
+                              if vacancy_id not in fingerprints]
+            report.removal_checked = True
+        elif full:
+            # В обрезанной выдаче отсутствие вакансии не значит, что она удалена
+            fingerprints = {**known, **fingerprints}
+
+        if report.changed:
+            self.storage.upsert(report.changed, city_name, prof_name)
+        if report.removed:
+            self.storage.delete_vacancies(report.removed)
+
+        with self.lock:
+            self.state[key] = {
+                "watermark": watermark,
+                "runs": 1 if full else query_state["runs"] + 1,
+                "synced_at": time.time(),
+                "fingerprints": fingerprints
+            }
+            self._save_state()
+        return report
+
+    def _save_state(self):
+        tmp_name = self.state_file + ".tmp"
+        with open(tmp_name, "w", encoding="utf-8") as file:
+            json.dump(self.state, file, ensure_ascii=False)
+        os.replace(tmp_name, self.state_file)
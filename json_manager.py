@@ -1,23 +1,44 @@
 import json
+import time
 from abstract_classes import JsonManager
+from metrics import registry
+from vacancy import Vacancy
 
 
 class JsonOperator(JsonManager):
     """Класс для обработки вакансий в json формате, записи, фильтрации, сортировки и удаления"""
 
-    def __init__(self, valid_vacancies):
+    def __init__(self, valid_vacancies, file_name="json_vac_info.json"):
         self.valid_vacancies = valid_vacancies
+        self.file_name = file_name
 
     def save_to_json(self):
-        """Сохранение вакансий в json"""
-        with open("json_vac_info.json", "w", encoding="utf-8") as file:
-            json.dump(self.valid_vacancies, file, indent=2, ensure_ascii=False)
+        """Сохранение вакансий в json
 
+        Вакансии записываются по одной, поэтому valid_vacancies может быть
+        генератором и не держится в памяти целиком. Возвращает число записей.
+        """
+        count = 0
+        # Время ожидания вакансий от генератора в этап сохранения не входит
+        elapsed = 0.0
+        with open(self.file_name, "w", encoding="utf-8") as file:
+            file.write("[")
+            for vacancy in self.valid_vacancies:
+                started = time.perf_counter()
+                item = json.dumps(vacancy.to_dict(), indent=2, ensure_ascii=False)
+                file.write(("," if count else "") + "\n  " + item.replace("\n", "\n  "))
+                count += 1
+                elapsed += time.perf_counter() - started
+            file.write("\n]" if count else "]")
+        registry.observe_stage("json_save", elapsed, count)
+        return count
+
+    @registry.timed("json_load")
     def get_json(self):
         """Получение вакансий из json"""
-        with open("json_vac_info.json", "r", encoding="utf-8") as file:
+        with open(self.file_name, "r", encoding="utf-8") as file:
             vacancies_info = json.load(file)
-            return vacancies_info
+            return [Vacancy.from_dict(vacancy_info) for vacancy_info in vacancies_info]
 
     @classmethod
     def delete_from_json(cls):
@@ -28,7 +49,7 @@ class JsonOperator(JsonManager):
     def get_vacancies_by_sal(self, salary):
         """Поиск вакансии по ЗП"""
         chosen_vacancies = [item for item in self.valid_vacancies
-                            if item["Зарплата от"] == salary]
+                            if item.salary_from == salary]
         if len(chosen_vacancies) > 0:
             return chosen_vacancies
         return "Упс. Кажется не нашлось ни одной вакансии с указанной зарплатой"
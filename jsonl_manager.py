@@ -0,0 +1,166 @@
+import argparse
+import json
+import mmap
+import os
+from array import array
+
+from abstract_classes import JsonManager
+from vacancy import Vacancy
+
+OFFSET_TYPECODE = "Q"
+OFFSET_SIZE = array(OFFSET_TYPECODE).itemsize
+
+
+class JsonLinesOperator(JsonManager):
+    """Хранение вакансий в формате JSON Lines: одна вакансия - одна строка
+
+    Новые вакансии дописываются в конец файла. Рядом хранится индекс
+    смещений строк (файл .idx), по которому запись N читается через mmap
+    без разбора всего файла.
+    """
+
+    def __init__(self, valid_vacancies=(), file_name="vacancies.jsonl"):
+        self.valid_vacancies = valid_vacancies
+        self.file_name = file_name
+        self.index_name = file_name + ".idx"
+
+    def save_to_json(self):
+        """Дописывание вакансий в конец файла, возвращает число записей"""
+        return self.append(self.valid_vacancies)
+
+    def append(self, vacancies):
+        """Дописывание вакансий и их смещений в индекс"""
+        self._ensure_index()
+        offsets = array(OFFSET_TYPECODE)
+        with open(self.file_name, "ab") as file:
+            offset = file.tell()
+            for vacancy in vacancies:
+                line = json.dumps(vacancy.to_dict(), ensure_ascii=False).encode("utf-8") + b"\n"
+                file.write(line)
+                offsets.append(offset)
+                offset += len(line)
+        with open(self.index_name, "ab") as index_file:
+            offsets.tofile(index_file)
+        return len(offsets)
+
+    def get_json(self):
+        """Получение всех вакансий из файла"""
+        return list(self.iter_vacancies())
+
+    def iter_vacancies(self, start=0):
+        """Генератор вакансий начиная с записи start, файл читается построчно"""
+        if not os.path.exists(self.file_name):
+            return
+        offset = 0
+        if start:
+            if start >= self.count():
+                return
+            offset = self._offset(start)
+        with open(self.file_name, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if line.strip():
+                    yield Vacancy.from_dict(json.loads(line))
+
+    def count(self):
+        """Количество записей в файле по индексу смещений"""
+        self._ensure_index()
+        return os.path.getsize(self.index_name) // OFFSET_SIZE
+
+    def get_record(self, position):
+        """Получение записи с номером position (с нуля) через mmap"""
+        if position < 0 or position >= self.count():
+            raise IndexError(f"Нет записи с номером {position}")
+        offset = self._offset(position)
+        with open(self.file_name, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                end = data.find(b"\n", offset)
+                line = data[offset:end if end != -1 else len(data)]
+        return Vacancy.from_dict(json.loads(line))
+
+    def truncate(self, position):
+        """Удаление записей начиная с номера position (с нуля)"""
+        if position >= self.count():
+            return
+        os.truncate(self.file_name, self._offset(position))
+        os.truncate(self.index_name, position * OFFSET_SIZE)
+
+    def _offset(self, position):
+        """Смещение записи position в файле по индексу"""
+        with open(self.index_name, "rb") as index_file:
+            index_file.seek(position * OFFSET_SIZE)
+            return array(OFFSET_TYPECODE, index_file.read(OFFSET_SIZE))[0]
+
+    def delete_from_json(self):
+        """Удаление всех вакансий из файла и индекса"""
+        for file_name in (self.file_name, self.index_name):
+            with open(file_name, "wb"):
+                pass
+
+    def compact(self):
+        """Перезапись файла без дублей: для каждого id остается последняя версия
+
+        Возвращает количество записей до и после сжатия.
+        """
+        latest = {}
+        total = 0
+        for vacancy in self.iter_vacancies():
+            latest.pop(vacancy.vacancy_id, None)
+            latest[vacancy.vacancy_id] = vacancy
+            total += 1
+        compacted = JsonLinesOperator(file_name=self.file_name + ".compact")
+        compacted.delete_from_json()
+        compacted.append(latest.values())
+        os.replace(compacted.file_name, self.file_name)
+        os.replace(compacted.index_name, self.index_name)
+        return total, len(latest)
+
+    def _ensure_index(self):
+        """Перестроение индекса, если он отсутствует или не совпадает с файлом"""
+        data_size = os.path.getsize(self.file_name) if os.path.exists(self.file_name) else 0
+        if os.path.exists(self.index_name):
+            index_size = os.path.getsize(self.index_name)
+            if index_size == 0 and data_size == 0:
+                return
+            if index_size and index_size % OFFSET_SIZE == 0:
+                with open(self.index_name, "rb") as index_file:
+                    index_file.seek(index_size - OFFSET_SIZE)
+                    last_offset = array(OFFSET_TYPECODE, index_file.read(OFFSET_SIZE))[0]
+                with open(self.file_name, "rb") as file:
+                    file.seek(last_offset)
+                    last_line = file.readline()
+                if last_line.endswith(b"\n") and last_offset + len(last_line) == data_size:
+                    return
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        """Построение индекса смещений одним проходом по файлу"""
+        offsets = array(OFFSET_TYPECODE)
+        if os.path.exists(self.file_name):
+            with open(self.file_name, "rb") as file:
+                offset = 0
+                for line in file:
+                    if line.strip():
+                        offsets.append(offset)
+                    offset += len(line)
+        with open(self.index_name, "wb") as index_file:
+            offsets.tofile(index_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Обслуживание хранилища вакансий JSON Lines")
+    parser.add_argument("command", choices=["compact", "reindex"])
+    parser.add_argument("file_name", nargs="?", default="vacancies.jsonl")
+    args = parser.parse_args(argv)
+
+    storage = JsonLinesOperator(file_name=args.file_name)
+    if args.command == "compact":
+        before, after = storage.compact()
+        print(f"Записей до сжатия: {before}, после: {after}")
+    else:
+        storage.rebuild_index()
+        print(f"Записей в индексе: {storage.count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
-from hh_vac_getter import HHApiEngine, hh_vac_info_validation, hh_data_formatting
-from sj_vac_getter import SJApiEngine, sj_vac_info_validation, sj_data_formatting
+from hh_vac_getter import HHApiEngine, iter_hh_vac_info_validation, iter_hh_data_formatting
+from sj_vac_getter import SJApiEngine, iter_sj_vac_info_validation, iter_sj_data_formatting
 from json_manager import JsonOperator
 from user_interface import UserInterface
+from http_transport import ApiError
+from currency_rates import get_default_currency_rates
+from metrics import setup_from_env
 
 if __name__ == "__main__":
+    setup_from_env()
     print(f"Привет! Я программа для сбора информации о вакансиях! Приступим!\n")
+    # Курсы валют загружаются один раз при запуске, проверка и форматирование
+    # вакансий к сети не обращаются
+    rates = get_default_currency_rates()
     while True:
         platform_input = input(f"Выбери платформу:\n1 - HeadHunter\n2 - SuperJob\n0 - Выйти\n> ")
         if platform_input not in ["0", "1", "2"]:
@@ -28,20 +35,27 @@ if __name__ == "__main__":
                                         f"\n> ").capitalize()
                 prof_input = input(f"А теперь мне необходимо узнать название профессии, например "
                                    f"Python разработчик или Визажист:\n> ").capitalize()
-                if platform_input == "1":
-                    hh_block = HHApiEngine(city_name_input, prof_input)
-                    vac_source = hh_block.get_vacancies()  # Получение вакансий с HeadHunter
-                    hh_valid_vac = hh_vac_info_validation(vac_source)  # Валидация вакансий
-                    fin_valid_list = hh_data_formatting(hh_valid_vac)  # Приведение к общему виду
+                try:
+                    if platform_input == "1":
+                        hh_block = HHApiEngine(city_name_input, prof_input)
+                        vac_source = hh_block.get_vacancies()  # Получение вакансий с HeadHunter
+                        # Валидация вакансий и приведение к общему виду
+                        hh_valid_vac = iter_hh_vac_info_validation(vac_source, rates=rates)
+                        fin_valid_list = iter_hh_data_formatting(hh_valid_vac, rates)
 
-                elif platform_input == "2":
-                    sj_block = SJApiEngine(city_name_input, prof_input)
-                    vac_source = sj_block.get_vacancies()  # Получение вакансий с SuperJob
-                    sj_valid_vac = sj_vac_info_validation(vac_source)  # Валидация вакансий
-                    fin_valid_list = sj_data_formatting(sj_valid_vac)  # Приведение к общему виду
+                    elif platform_input == "2":
+                        sj_block = SJApiEngine(city_name_input, prof_input)
+                        vac_source = sj_block.get_vacancies()  # Получение вакансий с SuperJob
+                        # Валидация вакансий и приведение к общему виду
+                        sj_valid_vac = iter_sj_vac_info_validation(vac_source, rates=rates)
+                        fin_valid_list = iter_sj_data_formatting(sj_valid_vac, rates)
+                except ApiError as error:
+                    print(f"Упс. Платформа не ответила: {error}. Попробуй еще раз!\n")
+                    continue
 
-            json_list = JsonOperator(fin_valid_list)
-            json_list.save_to_json()
-            work_vac_list = json_list.get_json()
+            # Список вакансий меню индексируется в памяти, файл JSON сохраняется
+            # для query_vacancies.py и обратно не читается
+            work_vac_list = list(fin_valid_list)
+            JsonOperator(work_vac_list).save_to_json()
             user_instance = UserInterface(work_vac_list)
             user_instance.functions_exe()
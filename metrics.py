@@ -0,0 +1,287 @@
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+PROMETHEUS_PREFIX = "vacancies_"
+# Границы корзин гистограмм длительности, секунды
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+METRICS_HELP = {
+    "stage_duration_seconds": "Длительность этапов обработки вакансий",
+    "stage_records_total": "Вакансий, прошедших этап",
+    "http_requests_total": "HTTP запросы к API по хосту и коду ответа",
+    "http_request_duration_seconds": "Время ответа API",
+    "http_response_bytes_total": "Получено байт от API",
+    "http_retries_total": "Повторы запросов по причине",
+    "http_rate_limit_waits_total": "Ожидания ограничителя частоты запросов",
+    "http_rate_limit_wait_seconds_total": "Суммарное время ожидания ограничителя частоты",
+    "http_cache_total": "Обращения к кэшу ответов по результату",
+    "validation_records_total": "Вакансии, принятые и отклоненные валидацией"
+}
+
+
+class Histogram:
+    """Гистограмма значений с фиксированными границами корзин"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        number = bisect_left(self.buckets, value)
+        if number < len(self.buckets):
+            self.counts[number] += 1
+
+    def cumulative(self):
+        """Накопленные количества по границам, как в формате Prometheus"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class MetricsRegistry:
+    """Счетчики и гистограммы работы программы с метками
+
+    Метрики собираются из всех потоков пакетного сбора, поэтому изменения
+    идут под блокировкой. Результат выгружается в JSON или в текстовый
+    формат Prometheus.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """Увеличение счетчика"""
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Добавление значения в гистограмму"""
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def observe_stage(self, stage, seconds, records=None, **labels):
+        """Длительность этапа и, если известно, число обработанных вакансий"""
+        self.observe("stage_duration_seconds", seconds, stage=stage, **labels)
+        if records is not None:
+            self.inc("stage_records_total", records, stage=stage, **labels)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Измерение длительности блока кода как этапа stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started, **labels)
+
+    def timed(self, stage, **labels):
+        """Декоратор измерения длительности вызовов функции как этапа stage"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe_stage(stage, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self):
+        """Сводка метрик в виде словаря для JSON"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        stages = {}
+        for (name, labels), histogram in histograms:
+            if name != "stage_duration_seconds":
+                continue
+            stage = ",".join(f"{key}={value}" for key, value in labels)
+            stages[stage] = {
+                "calls": histogram.count,
+                "total_seconds": round(histogram.sum, 6),
+                "mean_seconds": round(histogram.sum / histogram.count, 6)
+            }
+        return {
+            "generated_at": time.time(),
+            "stages": stages,
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in counters],
+            "histograms": [{"name": name, "labels": dict(labels), "count": histogram.count,
+                            "sum": histogram.sum,
+                            "buckets": {str(bound): count
+                                        for bound, count in histogram.cumulative()}}
+                           for (name, labels), histogram in histograms]
+        }
+
+    def to_prometheus(self):
+        """Метрики в текстовом формате Prometheus"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        lines = []
+        described = set()
+
+        def describe(name, metric_type):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {PROMETHEUS_PREFIX}{name} {METRICS_HELP.get(name, name)}")
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} {metric_type}")
+
+        for (name, labels), value in counters:
+            describe(name, "counter")
+            lines.append(f"{PROMETHEUS_PREFIX}{name}{format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            describe(name, "histogram")
+            for bound, count in histogram.cumulative():
+                bucket_labels = format_labels(labels + (("le", str(bound)),))
+                lines.append(f"{PROMETHEUS_PREFIX}{name}_bucket{bucket_labels} {count}")
+            inf_labels = format_labels(labels + (("le", "+Inf"),))
+            lines.append(f"{PROMETHEUS_PREFIX}{name}_bucket{inf_labels} {histogram.count}")
+            lines.append(f"{PROMETHEUS_PREFIX}{name}_sum{format_labels(labels)} {histogram.sum}")
+            lines.append(f"{PROMETHEUS_PREFIX}{name}_count{format_labels(labels)} "
+                         f"{histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+# Общий реестр метрик всех модулей
+registry = MetricsRegistry()
+
+
+class Profiler:
+    """Профилирование запуска через cProfile и tracemalloc
+
+    По завершении пишет файлы с префиксом path_prefix: .prof (для pstats
+    и snakeviz), _cpu.txt (функции по суммарному времени) и _memory.txt
+    (строки кода с наибольшим объемом выделенной памяти и пик).
+    Потоки, запущенные после start (загрузка страниц, пакетный сбор),
+    профилируются отдельными cProfile, и их статистика складывается с основной.
+    """
+
+    def __init__(self, path_prefix, top=30):
+        self.path_prefix = path_prefix
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        tracemalloc.start()
+        threading.setprofile(self._profile_thread)
+        self.profile.enable()
+        return self
+
+    def _profile_thread(self, *args):
+        """Включение отдельного профиля при первом вызове в новом потоке"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # С Python 3.12 cProfile работает через sys.monitoring и уже видит все потоки
+            sys.setprofile(None)
+            return
+        with self.lock:
+            self.thread_profiles.append(profile)
+
+    def stop(self):
+        self.profile.disable()
+        threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats = pstats.Stats(self.profile)
+        with self.lock:
+            for profile in self.thread_profiles:
+                stats.add(profile)
+        stats.dump_stats(self.path_prefix + ".prof")
+        with open(self.path_prefix + "_cpu.txt", "w", encoding="utf-8") as file:
+            stats.stream = file
+            stats.sort_stats("cumulative").print_stats(self.top)
+        with open(self.path_prefix + "_memory.txt", "w", encoding="utf-8") as file:
+            file.write(f"Пик выделенной памяти: {peak / 2 ** 20:.1f} МБ\n\n")
+            for statistic in snapshot.statistics("lineno")[:self.top]:
+                file.write(f"{statistic}\n")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def write_reports(json_path=None, prometheus_path=None):
+    """Выгрузка метрик общего реестра в указанные файлы"""
+    if json_path:
+        registry.write_json(json_path)
+    if prometheus_path:
+        registry.write_prometheus(prometheus_path)
+
+
+def setup_from_env():
+    """Включение выгрузки метрик и профилирования через переменные окружения
+
+    VACANCIES_METRICS_JSON и VACANCIES_METRICS_PROM - файлы метрик,
+    VACANCIES_PROFILE - префикс файлов профиля. Файлы пишутся при выходе.
+    """
+    json_path = os.getenv("VACANCIES_METRICS_JSON")
+    prometheus_path = os.getenv("VACANCIES_METRICS_PROM")
+    profile_prefix = os.getenv("VACANCIES_PROFILE")
+    profiler = Profiler(profile_prefix).start() if profile_prefix else None
+
+    def finish():
+        if profiler is not None:
+            profiler.stop()
+        write_reports(json_path, prometheus_path)
+
+    if profiler is not None or json_path or prometheus_path:
+        atexit.register(finish)
@@ -0,0 +1,288 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from itertools import islice
+
+from json_manager import JsonOperator
+from jsonl_manager import JsonLinesOperator
+from sqlite_manager import SQLiteOperator
+from text_index import InvertedIndex
+from vacancy import JSON_KEYS
+from vacancy_operator import in_salary_range
+from user_interface import output_formatting
+
+TABLE_COLUMNS = (("№", 6), ("Зарплата от", 11), ("Зарплата до", 11), ("Валюта", 6),
+                 ("Компания", 24), ("Вакансия", 40), ("Ссылка", 0))
+
+
+def open_store(path):
+    """Хранилище вакансий по расширению файла: .db/.sqlite, .jsonl или .json"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Нет файла хранилища {path}")
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteOperator(db_name=path)
+    if extension == ".jsonl":
+        return JsonLinesOperator(file_name=path)
+    return JsonOperator([], path)
+
+
+def iter_store(storage):
+    """Вакансии хранилища по одной, JSON файл читается целиком"""
+    if isinstance(storage, JsonOperator):
+        return iter(storage.get_json())
+    return storage.iter_vacancies()
+
+
+def page(vacancies, limit=None, offset=0):
+    """Страница результата без построения полного списка"""
+    return islice(vacancies, offset, None if limit is None else offset + limit)
+
+
+def query_all(storage, args):
+    if isinstance(storage, SQLiteOperator):
+        return storage.iter_vacancies(limit=args.limit, offset=args.offset)
+    return page(iter_store(storage), args.limit, args.offset)
+
+
+def query_filter(storage, args):
+    """Фильтр по зарплате, компании и валюте, порядок как в хранилище"""
+    if isinstance(storage, SQLiteOperator):
+        return storage.filter_vacancies(args.min_salary, args.max_salary, args.employer,
+                                        args.currency, limit=args.limit, offset=args.offset)
+    found = (vacancy for vacancy in iter_store(storage)
+             if (args.employer is None or vacancy.employer == args.employer)
+             and (args.currency is None or vacancy.currency == args.currency)
+             and in_salary_range(vacancy.salary_from, args.min_salary, args.max_salary))
+    return page(found, args.limit, args.offset)
+
+
+def query_top(storage, args):
+    """Топ N по минимальной зарплате, при равной зарплате - порядок хранилища
+
+    Из потока вакансий держится в памяти не больше offset + limit лучших.
+    """
+    count = args.count if args.limit is None else min(args.count, args.offset + args.limit)
+    if isinstance(storage, SQLiteOperator):
+        return storage.filter_vacancies(salary_minimum=0, top_by_salary=True,
+                                        limit=max(count - args.offset, 0), offset=args.offset)
+    with_salary = ((-vacancy.salary_from, position, vacancy)
+                   for position, vacancy in enumerate(iter_store(storage))
+                   if vacancy.salary_from is not None)
+    best = heapq.nsmallest(count, with_salary)
+    return [vacancy for _, _, vacancy in best[args.offset:]]
+
+
+def index_path(store_path):
+    """Файл полнотекстового индекса рядом с хранилищем"""
+    return store_path + ".idx.json"
+
+
+def store_modified_at(store_path):
+    """Время последнего изменения хранилища, для SQLite с учетом журнала WAL"""
+    return max(os.path.getmtime(path) for path in (store_path, store_path + "-wal")
+               if os.path.exists(path))
+
+
+def load_text_index(store_path):
+    """Сохраненный индекс хранилища или None, если его нет или хранилище новее"""
+    path = index_path(store_path)
+    if not os.path.exists(path) or os.path.getmtime(path) < store_modified_at(store_path):
+        return None
+    try:
+        return InvertedIndex.load(path)
+    except (OSError, ValueError, KeyError):
+        # Поврежденный или недописанный индекс строится заново
+        return None
+
+
+def build_text_index(storage):
+    """Полнотекстовый индекс по всем вакансиям хранилища
+
+    Документ в индексе для SQLite - id вакансии, для JSON и JSON Lines - номер
+    записи в файле, по которому найденная вакансия читается без разбора файла.
+    Из повторов одной вакансии в JSON Lines в индексе остается последняя запись.
+    """
+    text_index = InvertedIndex()
+    if isinstance(storage, SQLiteOperator):
+        text_index.add_vacancies(storage.iter_vacancies())
+        return text_index
+    positions = {}
+    for position, vacancy in enumerate(iter_store(storage)):
+        previous = positions.get(vacancy.vacancy_id)
+        if previous is not None:
+            text_index.remove(previous)
+        positions[vacancy.vacancy_id] = position
+        text_index.add(position, vacancy.description)
+    return text_index
+
+
+def get_found(storage, found):
+    """Вакансии по документам индекса в порядке релевантности"""
+    if isinstance(storage, SQLiteOperator):
+        vacancies = {vacancy.vacancy_id: vacancy
+                     for vacancy in storage.iter_vacancies_by_ids(found)}
+        return [vacancies[vacancy_id] for vacancy_id in found if vacancy_id in vacancies]
+    if isinstance(storage, JsonLinesOperator):
+        return (storage.get_record(position) for position in found)
+    vacancies = storage.get_json()
+    return [vacancies[position] for position in found]
+
+
+def query_keyword(storage, args):
+    """Поиск по ключевым словам по убыванию релевантности
+
+    Полнотекстовый индекс берется из файла <store>.idx.json, если он не старше
+    хранилища, иначе строится одним проходом по хранилищу и сохраняется для
+    следующих запросов. Из хранилища читаются только найденные вакансии.
+    """
+    text_index = load_text_index(args.store)
+    if text_index is None:
+        text_index = build_text_index(storage)
+        try:
+            text_index.save(index_path(args.store))
+        except OSError:
+            # Индекс только ускоряет повторные запросы, без него поиск работает
+            pass
+    limit = None if args.limit is None else args.offset + args.limit
+    found = text_index.search(args.keyword, args.mode, limit)[args.offset:]
+    return get_found(storage, found)
+
+
+def get_vacancy(storage, reference):
+    """Вакансия по порядковому номеру (с 1) или по id"""
+    if reference.isdigit():
+        position = int(reference) - 1
+        if position < 0:
+            raise IndexError(f"Нет вакансии {reference}")
+        if isinstance(storage, JsonLinesOperator):
+            return storage.get_record(position)
+        if isinstance(storage, SQLiteOperator):
+            found = list(storage.iter_vacancies(limit=1, offset=position))
+        else:
+            found = list(islice(iter_store(storage), position, position + 1))
+    elif isinstance(storage, SQLiteOperator):
+        found = list(storage.iter_vacancies("vacancy_id = ?", (reference,), limit=1))
+    else:
+        found = [vacancy for vacancy in iter_store(storage)
+                 if vacancy.vacancy_id == reference][:1]
+    if not found:
+        raise IndexError(f"Нет вакансии {reference}")
+    return found[0]
+
+
+def query_compare(storage, args):
+    """Две вакансии, первой - с большей минимальной зарплатой"""
+    first = get_vacancy(storage, args.first)
+    second = get_vacancy(storage, args.second)
+    if (first.salary_from or 0) >= (second.salary_from or 0):
+        return [first, second]
+    return [second, first]
+
+
+def write_jsonl(vacancies, stream, start):
+    for vacancy in vacancies:
+        stream.write(json.dumps(vacancy.to_dict(), ensure_ascii=False) + "\n")
+
+
+def write_csv(vacancies, stream, start):
+    writer = csv.writer(stream)
+    writer.writerow(JSON_KEYS.values())
+    for vacancy in vacancies:
+        row = vacancy.to_dict()
+        row[JSON_KEYS["extra_urls"]] = " ".join(vacancy.extra_urls)
+        writer.writerow(row.values())
+
+
+def write_table(vacancies, stream, start):
+    stream.write(format_row(name for name, _ in TABLE_COLUMNS))
+    for number, vacancy in enumerate(vacancies, start):
+        stream.write(format_row((number, vacancy.salary_from or "-", vacancy.salary_to or "-",
+                                 vacancy.currency, vacancy.employer, vacancy.name, vacancy.url)))
+
+
+def format_row(values):
+    cells = []
+    for value, (_, width) in zip(values, TABLE_COLUMNS):
+        value = " ".join(str(value).split())
+        if width:
+            value = value[:width - 1] + "…" if len(value) > width else value.ljust(width)
+        cells.append(value)
+    return " ".join(cells) + "\n"
+
+
+def write_text(vacancies, stream, start):
+    for item in output_formatting(vacancies, start):
+        stream.write(item + "\n")
+
+
+WRITERS = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "table": write_table,
+    "text": write_text
+}
+
+QUERIES = {
+    "all": query_all,
+    "filter": query_filter,
+    "top": query_top,
+    "keyword": query_keyword,
+    "compare": query_compare
+}
+
+
+def parse_args(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--store", default="json_vac_info.json",
+                        help="Хранилище вакансий: .json, .jsonl или база SQLite .db")
+    common.add_argument("--format", choices=list(WRITERS), default="table")
+    common.add_argument("--limit", type=int, help="Вывести не больше N вакансий")
+    common.add_argument("--offset", type=int, default=0, help="Пропустить первые N вакансий")
+
+    parser = argparse.ArgumentParser(
+        description="Запросы к сохраненным вакансиям без интерактивного меню")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("all", parents=[common], help="Все вакансии")
+    filter_parser = commands.add_parser("filter", parents=[common],
+                                        help="Фильтр по зарплате, компании и валюте")
+    filter_parser.add_argument("--min-salary", type=int)
+    filter_parser.add_argument("--max-salary", type=int)
+    filter_parser.add_argument("--employer")
+    filter_parser.add_argument("--currency")
+    top_parser = commands.add_parser("top", parents=[common],
+                                     help="Топ N вакансий по минимальной зарплате")
+    top_parser.add_argument("count", type=int)
+    keyword_parser = commands.add_parser("keyword", parents=[common],
+                                         help="Поиск по ключевым словам")
+    keyword_parser.add_argument("keyword")
+    keyword_parser.add_argument("--mode", choices=["and", "or"], default="and")
+    compare_parser = commands.add_parser("compare", parents=[common],
+                                         help="Сравнение двух вакансий по зарплате")
+    compare_parser.add_argument("first", help="Порядковый номер (с 1) или id вакансии")
+    compare_parser.add_argument("second", help="Порядковый номер (с 1) или id вакансии")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, stream=None):
+    args = parse_args(argv)
+    stream = stream or sys.stdout
+    try:
+        storage = open_store(args.store)
+        vacancies = QUERIES[args.command](storage, args)
+        WRITERS[args.format](vacancies, stream, args.offset + 1)
+        stream.flush()
+    except (FileNotFoundError, IndexError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # Вывод передан в head и подобные команды, которые закрыли канал раньше
+        sys.stdout = open(os.devnull, "w")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
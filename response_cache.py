@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_DIR = "http_cache"
+RESPONSE_CACHE_TTL = 60 * 60
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+TMP_FILE_MAX_AGE = 60  # Секунды, после которых временный файл считается брошенным
+
+
+class ResponseCache:
+    """LRU кэш ответов API на диске с ревалидацией по ETag/Last-Modified
+
+    В режиме offline ответы отдаются только из кэша, без обращения к сети.
+    В памяти держится только индекс LRU с метаданными записей (время
+    сохранения и валидаторы), тело ответа читается с диска при обращении.
+    Метаданные лежат рядом с телом в маленьком файле .meta, поэтому после
+    перезапуска проверка свежести не разбирает тело ответа.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_DIR, ttl=RESPONSE_CACHE_TTL,
+                 max_entries=RESPONSE_CACHE_MAX_ENTRIES, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(url, params=None):
+        """Ключ кэша по url и параметрам запроса"""
+        params_part = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(f"{url}?{params_part}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Метаданные записи кэша без тела ответа, None если записи нет"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            meta = self.entries[key]
+        if meta is None:
+            meta = self._read_meta(key)
+            with self.lock:
+                if meta is None:
+                    self.entries.pop(key, None)
+                elif key in self.entries:
+                    self.entries[key] = meta
+        return meta
+
+    def get_data(self, key):
+        """Тело сохраненного ответа с диска, None если файл пропал"""
+        entry = self._read_entry(key)
+        if entry is None:
+            with self.lock:
+                self.entries.pop(key, None)
+            return None
+        return entry["data"]
+
+    def is_fresh(self, entry):
+        """Проверка, что запись не старше ttl"""
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def put(self, key, url, params, data, headers):
+        """Сохранение тела ответа вместе с валидаторами ETag/Last-Modified"""
+        entry = {
+            "url": url,
+            "params": params,
+            "data": data,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time()
+        }
+        self._write_entry(key, entry)
+        with self.lock:
+            self.entries[key] = self._meta(entry)
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+        for evicted_key in evicted:
+            self._remove_file(evicted_key)
+        return entry
+
+    def refresh(self, key):
+        """Продление записи после ответа 304 Not Modified, возвращает тело ответа
+
+        Тело ответа не перезаписывается: обновляются метаданные и время
+        изменения файла, по которому восстанавливается порядок LRU.
+        """
+        entry = self._read_entry(key)
+        if entry is None:
+            return None
+        entry["stored_at"] = time.time()
+        meta = self._meta(entry)
+        try:
+            self._write_json(self._meta_path(key), meta)
+            os.utime(self._entry_path(key))
+        except OSError:
+            return None
+        with self.lock:
+            if key in self.entries:
+                self.entries[key] = meta
+        return entry["data"]
+
+    @staticmethod
+    def _meta(entry):
+        """Метаданные записи для индекса в памяти"""
+        return {key: entry.get(key) for key in ("etag", "last_modified", "stored_at")}
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Заголовки для условного запроса по сохраненной записи"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def clear(self):
+        """Удаление всех записей кэша"""
+        with self.lock:
+            keys = list(self.entries)
+            self.entries.clear()
+        for key in keys:
+            self._remove_file(key)
+
+    def _load_index(self):
+        """Восстановление порядка LRU по времени изменения файлов
+
+        Записи сверх max_entries (например, после уменьшения лимита), файлы
+        метаданных без тела ответа и временные файлы прерванной записи
+        удаляются, поэтому кэш на диске остается ограниченным.
+        """
+        mtimes = {}
+        meta_keys = []
+        for name in os.listdir(self.path):
+            file_path = os.path.join(self.path, name)
+            try:
+                if name.endswith(".json"):
+                    mtimes[name[:-5]] = os.path.getmtime(file_path)
+                elif name.endswith(".meta"):
+                    meta_keys.append(name[:-5])
+                elif (name.endswith(".tmp")
+                      and time.time() - os.path.getmtime(file_path) > TMP_FILE_MAX_AGE):
+                    # Свежий временный файл может дописывать другой процесс
+                    os.remove(file_path)
+            except OSError:
+                pass
+        keys = sorted(mtimes, key=mtimes.get)
+        surplus = max(len(keys) - self.max_entries, 0)
+        for key in keys[:surplus]:
+            self._remove_file(key)
+        for key in keys[surplus:]:
+            self.entries[key] = None
+        for key in meta_keys:
+            if key not in mtimes:
+                self._remove_file(key)
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def _meta_path(self, key):
+        return os.path.join(self.path, key + ".meta")
+
+    def _read_entry(self, key):
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _read_meta(self, key):
+        """Метаданные записи из файла .meta, для записей без него - из тела ответа"""
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            pass
+        entry = self._read_entry(key)
+        if entry is None:
+            return None
+        meta = self._meta(entry)
+        try:
+            self._write_json(self._meta_path(key), meta)
+        except OSError:
+            pass
+        return meta
+
+    def _write_entry(self, key, entry):
+        self._write_json(self._entry_path(key), entry)
+        self._write_json(self._meta_path(key), self._meta(entry))
+
+    @staticmethod
+    def _write_json(path, value):
+        tmp_path = path + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(value, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _remove_file(self, key):
+        for path in (self._entry_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
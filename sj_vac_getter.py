@@ -1,101 +1,173 @@
-import requests
+import math
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from abstract_classes import ApiEngine
+from metrics import registry
+from vacancy import Vacancy, make_vacancy_id
+from validation import SchemaValidator, SJ_RULES
+
+SJ_PER_PAGE = 100
+SJ_MAX_DEPTH = 500  # SuperJob не отдает больше 500 вакансий по одному запросу
 
 
 class SJApiEngine(ApiEngine):
-    def __init__(self, city_name, prof_name):
-        self.sj_api_url = "https://api.superjob.ru/2.0"
+    def __init__(self, city_name, prof_name, sj_api_url="https://api.superjob.ru/2.0",
+                 transport=None, date_from=None):
+        super().__init__(transport)
+        self.sj_api_url = sj_api_url
         self.SJ_API_TOKEN = os.getenv("SJ_TOKEN")
         self.headers = {
             "X-Api-App-Id": self.SJ_API_TOKEN
         }
         self.city_name = city_name
         self.prof_name = prof_name
+        # Загружать только вакансии, опубликованные не раньше date_from (unix time)
+        self.date_from = date_from
+        # Последний iter_vacancies получил всю выдачу, без обрезки по страницам и глубине
+        self.fetched_all = False
 
     def get_city_id(self):
         pass
 
-    def get_vacancies(self):
+    @registry.timed("get_vacancies", platform="sj")
+    def get_vacancies(self, all_pages=False, max_pages=None, max_workers=5):
         """Получение всех вакансий выбранного города"""
+        if not all_pages:
+            return self._get_page(0)["objects"]
+
+        return list(self.iter_vacancies(max_pages, max_workers))
+
+    def iter_vacancies(self, max_pages=None, max_workers=5):
+        """Генератор вакансий всех страниц по одной"""
+        for page_objects in self.iter_vacancy_pages(max_pages, max_workers):
+            yield from page_objects
+
+    def iter_vacancy_pages(self, max_pages=None, max_workers=5):
+        """Генератор страниц вакансий в порядке их получения
+
+        Если SuperJob сообщил total, страницы до него загружаются параллельно,
+        а дальше и без total страницы запрашиваются по очереди, пока выставлен
+        флаг more. Как только встречается страница с more=False, загрузка
+        прекращается. fetched_all выставляется, только если такая страница
+        получена: total не проверяется, и исчерпанный лимит страниц при more=True
+        оставляет выдачу неполной.
+        """
+        self.fetched_all = False
+        page_limit = SJ_MAX_DEPTH // SJ_PER_PAGE
+        if max_pages is not None:
+            page_limit = min(page_limit, max_pages)
+
+        first_page = self._get_page(0)
+        yield first_page["objects"]
+        if not first_page.get("more"):
+            self.fetched_all = True
+            return
+
+        page = 1
+        total = first_page.get("total")
+        if total:
+            pages_total = min(math.ceil(total / SJ_PER_PAGE), page_limit)
+            last_page = pages_total
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self._get_page, page): page
+                           for page in range(1, pages_total)}
+                for future in as_completed(futures):
+                    page = futures[future]
+                    if page >= last_page:
+                        continue
+                    page_data = future.result()
+                    yield page_data["objects"]
+                    if not page_data.get("more"):
+                        last_page = page
+                        for pending, pending_page in futures.items():
+                            if pending_page > page:
+                                pending.cancel()
+            if last_page < pages_total:
+                self.fetched_all = True
+                return
+            # Все страницы до total отмечены more=True: total занижен
+            page = pages_total
+
+        while page < page_limit:
+            page_data = self._get_page(page)
+            yield page_data["objects"]
+            if not page_data.get("more"):
+                self.fetched_all = True
+                return
+            page += 1
+
+    @registry.timed("get_page", platform="sj")
+    def _get_page(self, page):
+        """Получение одной страницы выдачи вакансий"""
         sj_vac_url = self.sj_api_url + "/vacancies"
         params = {
             "town": self.city_name,
             "keyword": self.prof_name,
-            "count": 100
+            "count": SJ_PER_PAGE,
+            "page": page
         }
-        response = requests.get(sj_vac_url, params=params, headers=self.headers)
-
-        if response.status_code == 200:
-            vacancies = response.json()
+        if self.date_from is not None:
+            params["date_published_from"] = self.date_from
+        return self.transport.get_json(sj_vac_url, params=params, headers=self.headers)
 
-        return vacancies["objects"]
 
-
-def sj_vac_info_validation(sj_vac_source_list):
+def sj_vac_info_validation(sj_vac_source_list, validator=None, rates=None):
     """Проверка входящих данных на корректность"""
-    hh_valid_vacancies = []
-    for vacancies in sj_vac_source_list:
-        if isinstance(vacancies["profession"], str):
-            vacancy_name = vacancies["profession"]
-
-        if "https://" in vacancies["link"]:
-            url = vacancies["link"]
-
-        if vacancies["payment_from"] is not None:
-            if (isinstance(vacancies["payment_from"], int) and
-                    vacancies["payment_from"] > 0):
-                salary_from = vacancies["payment_from"]
-
-            else:
-                salary_from = False
-
-            if (isinstance(vacancies["currency"], str) and
-                    vacancies["currency"] == "rub"):
-                salary_currency = vacancies["currency"]
+    return list(iter_sj_vac_info_validation(sj_vac_source_list, validator, rates))
 
-            else:
-                salary_currency = False
 
-            if (isinstance(vacancies["payment_to"], int) and
-                    vacancies["payment_to"] > 0):
-                salary_to = vacancies["payment_to"]
+def iter_sj_vac_info_validation(sj_vac_source_list, validator=None, rates=None):
+    """Проверка входящих данных на корректность пачками по странице
 
-            else:
-                salary_to = False
-        else:
-            salary_from = salary_currency = salary_to = False
+    Счетчики отклоненных вакансий по правилам накапливаются в validator.
+    Без validator он создается по таблице курсов rates.
+    """
+    validator = validator or SchemaValidator(
+        SJ_RULES, None if rates is None else rates.multipliers, name="sj")
+    return validator.iter_valid(sj_vac_source_list)
 
-        if vacancies["client"] is not None:
-            if ("title" in vacancies["client"]
-                    and isinstance(vacancies["client"]["title"], str)):
-                employer_name = vacancies["client"]["title"]
 
-            else:
-                employer_name = False
-
-        if isinstance(vacancies["candidat"], str):
-            requirement = vacancies["candidat"]
-
-        if (vacancy_name and url and salary_from and salary_currency and salary_to
-                and employer_name and requirement):
-            hh_valid_vacancies.append(vacancies)
-    return hh_valid_vacancies
-
-
-def sj_data_formatting(sj_vac_valid_list):
+def sj_data_formatting(sj_vac_valid_list, rates):
     """Метод для преобразования json формата в читабельный формат"""
-    sj_formed_vac = []
-    for vacancy in sj_vac_valid_list:
-        vacancies_items = {
-            "Наименование вакансии": vacancy["profession"],
-            "Ссылка на вакансию": vacancy["link"],
-            "Зарплата от": vacancy["payment_from"],
-            "Зарплата до": vacancy["payment_to"],
-            "Валюта": vacancy["currency"],
-            "Название компании": vacancy["client"]["title"],
-            "Требования и обязанности": vacancy["candidat"]
-        }
-
-        sj_formed_vac.append(vacancies_items)
-    return sj_formed_vac
+    return list(iter_sj_data_formatting(sj_vac_valid_list, rates))
+
+
+def iter_sj_data_formatting(sj_vac_valid_list, rates):
+    """Преобразование в читабельный формат по одной вакансии
+
+    Зарплаты переводятся в базовую валюту по таблице курсов rates,
+    загруженной до начала обработки.
+    """
+    multipliers = rates.multipliers
+    base_currency = rates.base_currency
+    elapsed = 0.0
+    count = 0
+    try:
+        for vacancy in sj_vac_valid_list:
+            started = time.perf_counter()
+            salary_from, salary_to = vacancy.get("payment_from"), vacancy.get("payment_to")
+            currency = vacancy["currency"]
+            multiplier = multipliers.get(currency)
+            if multiplier is not None:
+                salary_from = round(salary_from * multiplier) if salary_from else None
+                salary_to = round(salary_to * multiplier) if salary_to else None
+                currency = base_currency
+            vacancies_items = Vacancy(
+                name=vacancy["profession"],
+                url=vacancy["link"],
+                salary_from=salary_from or None,
+                salary_to=salary_to or None,
+                currency=currency,
+                employer=vacancy["client"]["title"],
+                description=vacancy["candidat"],
+                source="sj",
+                vacancy_id=make_vacancy_id("sj", vacancy["id"]),
+                city=(vacancy.get("town") or {}).get("title") or ""
+            )
+            elapsed += time.perf_counter() - started
+            count += 1
+            yield vacancies_items
+    finally:
+        # Учитывается только время преобразования, без ожидания источника
+        registry.observe_stage("formatting", elapsed, count, platform="sj")
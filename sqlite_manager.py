@@ -0,0 +1,254 @@
+import json
+import sqlite3
+import threading
+import time
+from itertools import islice
+
+from abstract_classes import JsonManager
+from dedup import dedup_key
+from vacancy import Vacancy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vacancies (
+    vacancy_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    salary_from INTEGER,
+    salary_to INTEGER,
+    currency TEXT,
+    employer TEXT,
+    description TEXT,
+    city TEXT,
+    query TEXT,
+    fetched_at REAL NOT NULL,
+    merged_into TEXT,
+    dedup_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vacancies_salary_from ON vacancies (salary_from);
+CREATE INDEX IF NOT EXISTS idx_vacancies_employer ON vacancies (employer);
+CREATE INDEX IF NOT EXISTS idx_vacancies_city ON vacancies (city);
+CREATE INDEX IF NOT EXISTS idx_vacancies_fetched_at ON vacancies (fetched_at);
+"""
+
+# Индексы по столбцам, которых может не быть в старой базе до _migrate
+ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_vacancies_merged_into ON vacancies (merged_into);
+CREATE INDEX IF NOT EXISTS idx_vacancies_dedup_key ON vacancies (dedup_key);
+"""
+
+UPSERT = """
+INSERT INTO vacancies (vacancy_id, source, name, url, salary_from, salary_to, currency,
+                       employer, description, city, query, fetched_at, dedup_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (vacancy_id) DO UPDATE SET
+    source = excluded.source,
+    name = excluded.name,
+    url = excluded.url,
+    salary_from = excluded.salary_from,
+    salary_to = excluded.salary_to,
+    currency = excluded.currency,
+    employer = excluded.employer,
+    description = excluded.description,
+    city = COALESCE(excluded.city, vacancies.city),
+    query = COALESCE(excluded.query, vacancies.query),
+    fetched_at = excluded.fetched_at,
+    dedup_key = excluded.dedup_key,
+    merged_into = NULL
+"""
+
+# Ссылки на другие платформы - это ссылки вакансий, поглощенных этой при объединении дублей
+VACANCY_COLUMNS = ("name, url, salary_from, salary_to, currency, employer, description, "
+                   "source, vacancy_id, city, "
+                   "(SELECT json_group_array(merged.url) FROM vacancies AS merged "
+                   "WHERE merged.merged_into = vacancies.vacancy_id)")
+# Столбцы, добавленные после первой версии схемы, для обновления старых баз
+ADDED_COLUMNS = {"merged_into": "TEXT", "dedup_key": "TEXT"}
+SQLITE_MAX_PARAMS = 500
+
+
+class SQLiteOperator(JsonManager):
+    """Хранение вакансий в SQLite: накопление между запусками и фильтрация в SQL
+
+    Вакансии добавляются или обновляются по id пачками в одной транзакции,
+    поэтому результаты разных запросов и платформ не затирают друг друга.
+    """
+
+    def __init__(self, valid_vacancies=(), db_name="vacancies.db", city=None, query=None,
+                 batch_size=1000):
+        self.valid_vacancies = valid_vacancies
+        self.db_name = db_name
+        self.city = city
+        self.query = query
+        self.batch_size = batch_size
+        # Запись из нескольких потоков пакетного сбора идет через общую блокировку
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_name, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self.connection.executescript(ADDED_INDEXES)
+
+    def _migrate(self):
+        """Добавление новых столбцов в базу, созданную прежней версией"""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(vacancies)")}
+        with self.connection:
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.connection.execute(
+                        f"ALTER TABLE vacancies ADD COLUMN {column} {column_type}")
+            if "dedup_key" not in columns:
+                rows = self.connection.execute("SELECT vacancy_id, employer, city FROM vacancies")
+                self.connection.executemany(
+                    "UPDATE vacancies SET dedup_key = ? WHERE vacancy_id = ?",
+                    [(dedup_key(employer, city), vacancy_id)
+                     for vacancy_id, employer, city in rows])
+
+    def close(self):
+        self.connection.close()
+
+    def save_to_json(self):
+        """Сохранение вакансий в базу, возвращает число записей"""
+        return self.upsert(self.valid_vacancies, self.city, self.query)
+
+    def upsert(self, vacancies, city=None, query=None):
+        """Добавление или обновление вакансий по id пачками по batch_size
+
+        Город берется из вакансии, а если платформа его не указала - из запроса.
+        Обновленная вакансия перестает считаться дублем, пока ее группа не будет
+        заново проверена в replace_merges.
+        """
+        fetched_at = time.time()
+        rows = ((vacancy.vacancy_id, vacancy.source, vacancy.name, vacancy.url,
+                 vacancy.salary_from, vacancy.salary_to, vacancy.currency, vacancy.employer,
+                 vacancy.description, vacancy.city or city, query, fetched_at,
+                 dedup_key(vacancy.employer, vacancy.city or city))
+                for vacancy in vacancies)
+        count = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return count
+            with self.lock, self.connection:
+                self.connection.executemany(UPSERT, batch)
+            count += len(batch)
+
+    def get_json(self):
+        """Получение всех вакансий из базы"""
+        return list(self.iter_vacancies())
+
+    def iter_vacancies(self, where="", params=(), order_by="rowid", limit=None, offset=0,
+                       merged=False):
+        """Генератор вакансий из базы по условию
+
+        Вакансии, объединенные с дублем на другой платформе, отдаются только
+        с merged=True, в остальных случаях видна лишь основная вакансия группы.
+        """
+        sql = f"SELECT {VACANCY_COLUMNS} FROM vacancies"
+        conditions = [where] if where else []
+        if not merged:
+            conditions.append("merged_into IS NULL")
+        if conditions:
+            sql += " WHERE " + " AND ".join(f"({condition})" for condition in conditions)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params = (*params, -1 if limit is None else limit, offset)
+        for row in self.connection.execute(sql, params):
+            *values, city, extra_urls = row
+            yield Vacancy(*values, city=city or "",
+                          extra_urls=tuple(json.loads(extra_urls or "[]")))
+
+    def iter_vacancies_by_ids(self, vacancy_ids):
+        """Генератор вакансий с указанными id, запросами по SQLITE_MAX_PARAMS id"""
+        vacancy_ids = list(vacancy_ids)
+        for start in range(0, len(vacancy_ids), SQLITE_MAX_PARAMS):
+            chunk = vacancy_ids[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            yield from self.iter_vacancies(f"vacancy_id IN ({placeholders})", chunk)
+
+    def dedup_keys(self, vacancy_ids):
+        """Ключи групп дублей, которых касаются вакансии с указанными id
+
+        Кроме групп самих вакансий учитываются группы вакансий, объединенных
+        с ними: у обновленной вакансии могли смениться компания или город.
+        """
+        vacancy_ids = list(vacancy_ids)
+        keys = set()
+        for start in range(0, len(vacancy_ids), SQLITE_MAX_PARAMS):
+            chunk = vacancy_ids[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT DISTINCT dedup_key FROM vacancies WHERE dedup_key IS NOT NULL "
+                f"AND (vacancy_id IN ({placeholders}) OR merged_into IN ({placeholders}))",
+                chunk * 2)
+            keys.update(key for key, in rows)
+        return keys
+
+    def iter_vacancies_by_dedup_keys(self, keys):
+        """Все вакансии групп дублей, включая объединенные, в порядке добавления"""
+        placeholders = ", ".join("?" * len(keys))
+        return self.iter_vacancies(f"dedup_key IN ({placeholders})", list(keys), merged=True)
+
+    def replace_merges(self, keys, merged_into):
+        """Замена объединения дублей в группах keys на словарь {id дубля: id основной}"""
+        keys = list(keys)
+        placeholders = ", ".join("?" * len(keys))
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"UPDATE vacancies SET merged_into = NULL WHERE dedup_key IN ({placeholders})",
+                keys)
+            self.connection.executemany(
+                "UPDATE vacancies SET merged_into = ? WHERE vacancy_id = ?",
+                ((main_id, vacancy_id) for vacancy_id, main_id in merged_into.items()))
+
+    def delete_from_json(self):
+        """Удаление всех вакансий из базы"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM vacancies")
+
+    def delete_vacancies(self, vacancy_ids):
+        """Удаление вакансий по id
+
+        Дубли, объединенные с удаленной вакансией, снова становятся видны:
+        публикация на другой платформе еще существует.
+        """
+        vacancy_ids = [(vacancy_id,) for vacancy_id in vacancy_ids]
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM vacancies WHERE vacancy_id = ?",
+                                        vacancy_ids)
+            self.connection.executemany(
+                "UPDATE vacancies SET merged_into = NULL WHERE merged_into = ?", vacancy_ids)
+
+    def count(self):
+        """Количество вакансий в базе без объединенных дублей"""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM vacancies WHERE merged_into IS NULL").fetchone()[0]
+
+    def filter_vacancies(self, salary_minimum=None, salary_maximum=None, employer=None,
+                         currency=None, city=None, source=None, fetched_after=None,
+                         top_by_salary=False, limit=None, offset=0):
+        """Генератор вакансий по фильтру, отбор и страница выполняются запросом к базе"""
+        conditions = []
+        params = []
+        for column, operator, value in (("salary_from", ">=", salary_minimum),
+                                        ("salary_from", "<=", salary_maximum),
+                                        ("employer", "=", employer),
+                                        ("currency", "=", currency),
+                                        ("city", "=", city),
+                                        ("source", "=", source),
+                                        ("fetched_at", ">=", fetched_after)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        order_by = "salary_from DESC, rowid" if top_by_salary else "rowid"
+        return self.iter_vacancies(" AND ".join(conditions), params, order_by, limit, offset)
+
+    def get_vacancies_by_sal(self, salary):
+        """Поиск вакансии по ЗП"""
+        chosen_vacancies = list(self.filter_vacancies(salary_minimum=salary,
+                                                      salary_maximum=salary))
+        if len(chosen_vacancies) > 0:
+            return chosen_vacancies
+        return "Упс. Кажется не нашлось ни одной вакансии с указанной зарплатой"
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from area_cache import AreaCache
+from http_transport import HttpTransport
+from benchmarks.stub_server import StubApiServer
+from benchmarks.synthetic import iter_hh_items, iter_sj_items, synthetic_currency_rates
+
+POOL_SIZE = 50  # Различных вакансий в пуле локального сервера
+
+
+@pytest.fixture
+def stub_server():
+    """Локальный сервер API, пулы вакансий можно менять внутри теста"""
+    server = StubApiServer(list(iter_hh_items(POOL_SIZE)), list(iter_sj_items(POOL_SIZE)))
+    with server:
+        yield server
+
+
+@pytest.fixture
+def transport():
+    return HttpTransport(backoff_factor=0, max_concurrency=8)
+
+
+@pytest.fixture
+def area_cache(tmp_path):
+    return AreaCache(str(tmp_path / "areas.json"))
+
+
+@pytest.fixture
+def rates():
+    return synthetic_currency_rates()
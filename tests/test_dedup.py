@@ -0,0 +1,91 @@
+import pytest
+
+from batch_harvest import deduplicate_harvest, deduplicate_storage
+from dedup import VacancyDeduplicator, dedup_key
+from jsonl_manager import JsonLinesOperator
+from sqlite_manager import SQLiteOperator
+from vacancy import Vacancy
+
+DESCRIPTION = ("Опыт разработки на Python от 3 лет, знание Django и PostgreSQL, "
+               "работа с Docker и очередями сообщений")
+
+
+def make_vacancy(source, number, employer="ООО Ромашка", name="Python разработчик",
+                 description=DESCRIPTION, salary_from=200000):
+    return Vacancy(name, f"https://{source}.example/{number}", salary_from, salary_from + 50000,
+                   "RUR", employer, description, source, f"{source}:{number}", city="Москва")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteOperator(db_name=str(tmp_path / "vacancies.db"))
+    yield storage
+    storage.close()
+
+
+def test_dedup_key_ignores_legal_form_and_case():
+    assert dedup_key("ООО «Ромашка»", "Москва") == dedup_key("ромашка", " москва ")
+    assert dedup_key("", "Москва") is None
+
+
+def test_same_vacancy_on_two_platforms_is_merged():
+    hh, sj = make_vacancy("hh", 1), make_vacancy("sj", 2, employer="Ромашка")
+    merged = VacancyDeduplicator().deduplicate([hh, sj])
+    assert len(merged) == 1
+    assert merged[0].vacancy_id == "hh:1"
+    assert merged[0].extra_urls == (sj.url,)
+
+
+def test_one_vacancy_per_platform_in_group():
+    vacancies = [make_vacancy("hh", 1), make_vacancy("hh", 2), make_vacancy("sj", 3)]
+    groups = VacancyDeduplicator().find_groups(vacancies)
+    assert sorted(map(sorted, groups)) == [[0, 2], [1]]
+
+
+def test_different_vacancies_are_kept():
+    vacancies = [make_vacancy("hh", 1),
+                 make_vacancy("sj", 2, name="Бухгалтер", description="Первичная документация"),
+                 make_vacancy("sj", 3, employer="Лютик"),
+                 make_vacancy("sj", 4, salary_from=90000)]
+    assert VacancyDeduplicator().deduplicate(vacancies) == vacancies
+
+
+def test_harvest_dedup_rewrites_only_run_records(tmp_path):
+    output = JsonLinesOperator(file_name=str(tmp_path / "vacancies.jsonl"))
+    previous = make_vacancy("hh", 100, employer="Лютик")
+    output.append([previous])
+    run = [make_vacancy("hh", 1), make_vacancy("sj", 2)]
+    output.append(run)
+    assert deduplicate_harvest(list(output.iter_vacancies(1)), output, start=1) == 1
+    stored = output.get_json()
+    assert [vacancy.vacancy_id for vacancy in stored] == ["hh:100", "hh:1"]
+    assert stored[1].extra_urls == (run[1].url,)
+    assert output.count() == 2
+
+
+def test_storage_dedup_matches_vacancies_of_previous_runs(storage):
+    storage.upsert([make_vacancy("hh", 1)])
+    assert deduplicate_storage(storage, ["hh:1"]) == 0
+    storage.upsert([make_vacancy("sj", 2, employer="Ромашка")])
+    assert deduplicate_storage(storage, ["sj:2"]) == 1
+    stored = storage.get_json()
+    assert [vacancy.vacancy_id for vacancy in stored] == ["hh:1"]
+    assert stored[0].extra_urls == ("https://sj.example/2",)
+    assert storage.count() == 1
+
+
+def test_deleted_main_vacancy_restores_merged_duplicate(storage):
+    storage.upsert([make_vacancy("hh", 1), make_vacancy("sj", 2)])
+    deduplicate_storage(storage, ["hh:1", "sj:2"])
+    storage.delete_vacancies(["hh:1"])
+    stored = storage.get_json()
+    assert [vacancy.vacancy_id for vacancy in stored] == ["sj:2"]
+    assert stored[0].extra_urls == ()
+
+
+def test_updated_duplicate_is_checked_again(storage):
+    storage.upsert([make_vacancy("hh", 1), make_vacancy("sj", 2)])
+    deduplicate_storage(storage, ["hh:1", "sj:2"])
+    storage.upsert([make_vacancy("sj", 2, name="Бухгалтер", description="Первичная документация")])
+    assert deduplicate_storage(storage, ["sj:2"]) == 0
+    assert storage.count() == 2
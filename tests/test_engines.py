@@ -0,0 +1,69 @@
+from hh_vac_getter import HHApiEngine, HH_PER_PAGE
+from sj_vac_getter import SJApiEngine, SJ_PER_PAGE
+from benchmarks.stub_server import StubApiServer
+
+
+def make_hh_engine(server, count, transport, area_cache):
+    return HHApiEngine("Москва", "Python", hh_api_url=f"{server.url}/hh/{count}",
+                       transport=transport, area_cache=area_cache)
+
+
+def make_sj_engine(server, count, transport):
+    return SJApiEngine("Москва", "Python", sj_api_url=f"{server.url}/sj/{count}/2.0",
+                       transport=transport)
+
+
+class WrongTotalServer(StubApiServer):
+    """Сервер, который сообщает в total не то число вакансий SuperJob, что отдает"""
+
+    def __init__(self, hh_items, sj_items, total):
+        super().__init__(hh_items, sj_items)
+        self.total = total
+
+    def sj_page(self, count, page, per_page):
+        return dict(super().sj_page(count, page, per_page), total=self.total)
+
+
+def test_hh_pages_are_yielded_in_order(stub_server, transport, area_cache):
+    engine = make_hh_engine(stub_server, 250, transport, area_cache)
+    ids = [item["id"] for item in engine.iter_vacancies(max_workers=4)]
+    assert ids == [str(number) for number in range(250)]
+    assert engine.fetched_all
+    assert area_cache.get("москва") == "1"
+
+
+def test_hh_max_pages_marks_result_incomplete(stub_server, transport, area_cache):
+    engine = make_hh_engine(stub_server, 250, transport, area_cache)
+    ids = [item["id"] for item in engine.iter_vacancies(max_pages=2)]
+    assert ids == [str(number) for number in range(2 * HH_PER_PAGE)]
+    assert not engine.fetched_all
+
+
+def test_sj_fetches_all_pages(stub_server, transport):
+    engine = make_sj_engine(stub_server, 250, transport)
+    ids = sorted(item["id"] for item in engine.iter_vacancies())
+    assert ids == list(range(250))
+    assert engine.fetched_all
+
+
+def test_sj_max_pages_with_more_is_incomplete(stub_server, transport):
+    engine = make_sj_engine(stub_server, 250, transport)
+    items = list(engine.iter_vacancies(max_pages=2))
+    assert len(items) == 2 * SJ_PER_PAGE
+    assert not engine.fetched_all
+
+
+def test_sj_stops_at_page_without_more(stub_server, transport):
+    with WrongTotalServer(stub_server.hh_items, stub_server.sj_items, total=450) as server:
+        engine = make_sj_engine(server, 150, transport)
+        ids = sorted(item["id"] for item in engine.iter_vacancies())
+    assert ids == list(range(150))
+    assert engine.fetched_all
+
+
+def test_sj_understated_total_continues_while_more(stub_server, transport):
+    with WrongTotalServer(stub_server.hh_items, stub_server.sj_items, total=50) as server:
+        engine = make_sj_engine(server, 250, transport)
+        ids = sorted(item["id"] for item in engine.iter_vacancies())
+    assert ids == list(range(250))
+    assert engine.fetched_all
@@ -0,0 +1,97 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_transport
+from http_transport import ApiError, HttpTransport, parse_retry_after
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Отвечает статусами из server.statuses по очереди, затем 200"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests += 1
+        status, headers = self.server.statuses.pop(0) if self.server.statuses else (200, {})
+        body = json.dumps({"ok": True}).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def scripted_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.daemon_threads = True
+    server.statuses = []
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    server.url = f"http://{host}:{port}/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Паузы перед повторами записываются вместо ожидания"""
+    delays = []
+    monkeypatch.setattr(http_transport.time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_until_success(scripted_server, sleeps):
+    scripted_server.statuses = [(503, {}), (502, {})]
+    transport = HttpTransport(backoff_factor=0.5)
+    assert transport.get_json(scripted_server.url) == {"ok": True}
+    assert scripted_server.requests == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retry_after_header_sets_delay(scripted_server, sleeps):
+    scripted_server.statuses = [(429, {"Retry-After": "7"})]
+    transport = HttpTransport(backoff_factor=0.5)
+    assert transport.get_json(scripted_server.url) == {"ok": True}
+    assert sleeps == [7.0]
+
+
+def test_retry_after_is_capped_by_max_backoff(scripted_server, sleeps):
+    scripted_server.statuses = [(429, {"Retry-After": "3600"})]
+    HttpTransport(max_backoff=30).get_json(scripted_server.url)
+    assert sleeps == [30]
+
+
+def test_error_after_last_retry(scripted_server, sleeps):
+    scripted_server.statuses = [(503, {})] * 3
+    with pytest.raises(ApiError) as error:
+        HttpTransport(max_retries=2, backoff_factor=0).get_json(scripted_server.url)
+    assert error.value.status_code == 503
+    assert scripted_server.requests == 3
+
+
+def test_client_error_is_not_retried(scripted_server, sleeps):
+    scripted_server.statuses = [(404, {})]
+    with pytest.raises(ApiError):
+        HttpTransport().get_json(scripted_server.url)
+    assert scripted_server.requests == 1
+    assert sleeps == []
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
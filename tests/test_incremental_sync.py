@@ -0,0 +1,70 @@
+import pytest
+
+import incremental_sync
+from hh_vac_getter import HHApiEngine
+from incremental_sync import IncrementalSync
+from sqlite_manager import SQLiteOperator
+
+
+@pytest.fixture
+def syncer(tmp_path, stub_server, transport, area_cache, rates, monkeypatch):
+    """IncrementalSync по выдаче HeadHunter локального сервера, размер выдачи в syncer.count"""
+    storage = SQLiteOperator(db_name=str(tmp_path / "vacancies.db"))
+    syncer = IncrementalSync(storage, str(tmp_path / "sync_state.json"), transport=transport,
+                             rates=rates)
+    syncer.count = 120
+
+    def engine_class(city_name, prof_name, transport=None):
+        return HHApiEngine(city_name, prof_name, f"{stub_server.url}/hh/{syncer.count}",
+                           transport=transport, area_cache=area_cache)
+
+    _, *platform = incremental_sync.SYNC_PLATFORMS["hh"]
+    monkeypatch.setitem(incremental_sync.SYNC_PLATFORMS, "hh", (engine_class, *platform))
+    yield syncer
+    storage.close()
+
+
+def test_first_sync_adds_all(syncer):
+    report = syncer.sync("hh", "Москва", "Python")
+    assert report.full
+    assert report.fetched == 120
+    assert len(report.added) == syncer.storage.count() > 0
+    assert not report.updated and not report.removed
+
+
+def test_unchanged_vacancies_are_not_reported(syncer):
+    syncer.sync("hh", "Москва", "Python")
+    report = syncer.sync("hh", "Москва", "Python")
+    assert not report.full
+    assert not report.changed and not report.removed
+
+
+def test_changed_vacancy_is_updated(syncer, stub_server):
+    first = syncer.sync("hh", "Москва", "Python")
+    stub_server.hh_items[0] = dict(stub_server.hh_items[0], name="Ведущий разработчик")
+    report = syncer.sync("hh", "Москва", "Python")
+    # Вакансии выдачи берутся из пула по кругу, изменились все копии первой
+    expected = {vacancy.vacancy_id for vacancy in first.added
+                if int(vacancy.vacancy_id.split(":")[1]) % len(stub_server.hh_items) == 0}
+    assert {vacancy.vacancy_id for vacancy in report.updated} == expected
+    assert not report.added
+    stored = list(syncer.storage.iter_vacancies_by_ids(expected))
+    assert stored and all(vacancy.name == "Ведущий разработчик" for vacancy in stored)
+
+
+def test_full_sync_removes_missing_vacancies(syncer):
+    first = syncer.sync("hh", "Москва", "Python")
+    syncer.count = 60
+    report = syncer.sync("hh", "Москва", "Python", full=True)
+    assert report.removal_checked
+    assert set(report.removed) == {vacancy.vacancy_id for vacancy in first.added
+                                   if int(vacancy.vacancy_id.split(":")[1]) >= 60}
+    assert syncer.storage.count() == len(first.added) - len(report.removed)
+
+
+def test_truncated_full_sync_keeps_vacancies(syncer):
+    first = syncer.sync("hh", "Москва", "Python")
+    report = syncer.sync("hh", "Москва", "Python", full=True, max_pages=1)
+    assert not report.removal_checked
+    assert not report.removed
+    assert syncer.storage.count() == len(first.added)
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+
+from jsonl_manager import JsonLinesOperator
+from sqlite_manager import SQLiteOperator
+from text_index import InvertedIndex
+from vacancy import Vacancy
+
+
+def make_vacancy(number, salary_from=100000, description="Python Django"):
+    return Vacancy(f"Разработчик {number}", f"https://hh.ru/vacancy/{number}", salary_from, None,
+                   "RUR", "Ромашка", description, "hh", f"hh:{number}", city="Москва")
+
+
+def test_jsonl_reads_records_by_position(tmp_path):
+    store = JsonLinesOperator(file_name=str(tmp_path / "vacancies.jsonl"))
+    store.append(make_vacancy(number) for number in range(5))
+    store.append([make_vacancy(5)])
+    assert store.count() == 6
+    assert store.get_record(3).vacancy_id == "hh:3"
+    assert [vacancy.vacancy_id for vacancy in store.iter_vacancies(4)] == ["hh:4", "hh:5"]
+
+
+def test_jsonl_index_is_rebuilt(tmp_path):
+    store = JsonLinesOperator(file_name=str(tmp_path / "vacancies.jsonl"))
+    store.append(make_vacancy(number) for number in range(3))
+    os.remove(store.index_name)
+    assert store.get_record(2).vacancy_id == "hh:2"
+    # Запись, дописанная в файл в обход индекса
+    with open(store.file_name, "r", encoding="utf-8") as file:
+        first_line = file.readline()
+    with open(store.file_name, "a", encoding="utf-8") as file:
+        file.write(first_line)
+    assert store.count() == 4
+    assert store.get_record(3).vacancy_id == "hh:0"
+
+
+def test_jsonl_truncate_and_compact(tmp_path):
+    store = JsonLinesOperator(file_name=str(tmp_path / "vacancies.jsonl"))
+    store.append(make_vacancy(number) for number in range(4))
+    store.truncate(2)
+    assert store.count() == 2
+    store.append([make_vacancy(0, salary_from=150000)])
+    assert store.compact() == (3, 2)
+    assert [(vacancy.vacancy_id, vacancy.salary_from) for vacancy in store.get_json()] == [
+        ("hh:1", 100000), ("hh:0", 150000)]
+
+
+def test_sqlite_upsert_updates_by_id(tmp_path):
+    storage = SQLiteOperator(db_name=str(tmp_path / "vacancies.db"))
+    storage.upsert([make_vacancy(1), make_vacancy(2)], city="Москва", query="Python")
+    storage.upsert([make_vacancy(1, salary_from=250000)])
+    assert storage.count() == 2
+    assert [vacancy.vacancy_id for vacancy in storage.filter_vacancies(salary_minimum=200000)] \
+        == ["hh:1"]
+    storage.close()
+
+
+def test_sqlite_migrates_old_schema(tmp_path):
+    db_name = str(tmp_path / "old.db")
+    connection = sqlite3.connect(db_name)
+    connection.execute("CREATE TABLE vacancies (vacancy_id TEXT PRIMARY KEY, "
+                       "source TEXT NOT NULL, name TEXT NOT NULL, url TEXT NOT NULL, "
+                       "salary_from INTEGER, salary_to INTEGER, currency TEXT, employer TEXT, "
+                       "description TEXT, city TEXT, query TEXT, fetched_at REAL NOT NULL)")
+    connection.execute("INSERT INTO vacancies VALUES ('hh:1', 'hh', 'Разработчик', "
+                       "'https://hh.ru/vacancy/1', 100000, NULL, 'RUR', 'ООО Ромашка', "
+                       "'Python', 'Москва', NULL, 0)")
+    connection.commit()
+    connection.close()
+
+    storage = SQLiteOperator(db_name=db_name)
+    assert [vacancy.vacancy_id for vacancy in storage.get_json()] == ["hh:1"]
+    assert storage.connection.execute("SELECT dedup_key FROM vacancies").fetchone() == (
+        "ромашка|москва",)
+    storage.close()
+
+
+def test_inverted_index_remove_and_compact():
+    index = InvertedIndex()
+    index.add("a", "Python Django разработка")
+    index.add("b", "Python FastAPI")
+    index.add("c", "Бухгалтерия")
+    index.remove("a")
+    assert index.search("Python") == ["b"]
+    assert index.search("Django") == []
+    index.add("b", "Go разработка")
+    assert index.search("Python") == []
+    index.compact()
+    assert len(index) == len(index.doc_ids) == 2
+    assert index.search("разработка") == ["b"]
+    assert index.search("Бухгалтерия") == ["c"]
+
+
+def test_inverted_index_save_and_load(tmp_path):
+    index = InvertedIndex()
+    index.add("a", "Python Django")
+    index.add("b", "Python FastAPI")
+    index.remove("a")
+    file_name = str(tmp_path / "index.json")
+    index.save(file_name)
+    loaded = InvertedIndex.load(file_name)
+    assert loaded.search("Python") == ["b"]
+    assert loaded.search('"Python FastAPI"') == ["b"]
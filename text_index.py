@@ -0,0 +1,204 @@
+import heapq
+import json
+import math
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r"[0-9a-zа-яё+#]+")
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Окончания упорядочены по убыванию длины, отрезается первое подходящее
+RU_ENDINGS = sorted([
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией", "ость",
+    "ости", "ение", "ения", "ении", "ений", "ание", "ания", "ании", "аний", "ться", "тся",
+    "ешь", "ете", "ишь", "ите", "ала", "ила", "ать", "ять", "ить", "еть", "ует", "ают",
+    "яют", "ой", "ей", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ом", "ем", "ам",
+    "ям", "ах", "ях", "ую", "юю", "ов", "ев", "ию", "ия", "ь", "а", "я", "о", "е", "ы",
+    "и", "у", "ю", "й"
+], key=len, reverse=True)
+EN_ENDINGS = ["ations", "ation", "ments", "ment", "ings", "ing", "ies", "ers", "er", "ed",
+              "es", "e", "s"]
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=200000)
+def stem(token):
+    """Упрощенный стемминг русских и английских слов отрезанием окончаний"""
+    token = token.replace("ё", "е")
+    endings = RU_ENDINGS if re.search("[а-я]", token) else EN_ENDINGS
+    for ending in endings:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def tokenize(text):
+    """Разбиение текста на нормализованные основы слов"""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower())]
+
+
+class InvertedIndex:
+    """Инвертированный индекс по тексту требований и обязанностей вакансий
+
+    Для каждой основы слова хранятся позиции в описании вакансии, что
+    позволяет искать фразы. Результаты ранжируются по TF-IDF. Для каждого
+    документа запоминаются его основы, чтобы при удалении или обновлении
+    сразу убрать его из списков позиций.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_ids = []
+        self.doc_positions = {}
+        self.doc_lengths = []
+        self.doc_terms = []
+
+    def __len__(self):
+        return len(self.doc_positions)
+
+    def add(self, doc_id, text):
+        """Добавление или обновление одного документа в индексе"""
+        if doc_id in self.doc_positions:
+            self.remove(doc_id)
+        doc_number = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_positions[doc_id] = doc_number
+        tokens = tokenize(text)
+        self.doc_lengths.append(len(tokens))
+        self.doc_terms.append(tuple(set(tokens)))
+        for position, token in enumerate(tokens):
+            self.postings[token].setdefault(doc_number, []).append(position)
+
+    def add_vacancies(self, vacancies):
+        """Добавление вакансий, например новой страницы выдачи"""
+        for vacancy in vacancies:
+            self.add(vacancy.vacancy_id, vacancy.description)
+
+    def remove(self, doc_id):
+        """Удаление документа из индекса вместе с его позициями
+
+        Номер документа остается свободным до сжатия индекса (compact).
+        """
+        doc_number = self.doc_positions.pop(doc_id, None)
+        if doc_number is None:
+            return
+        self.doc_ids[doc_number] = None
+        for term in self.doc_terms[doc_number]:
+            term_docs = self.postings[term]
+            del term_docs[doc_number]
+            if not term_docs:
+                del self.postings[term]
+        self.doc_terms[doc_number] = ()
+
+    def compact(self):
+        """Перенумерация документов без номеров удаленных"""
+        if len(self.doc_positions) == len(self.doc_ids):
+            return
+        numbers = {}
+        for doc_number, doc_id in enumerate(self.doc_ids):
+            if doc_id is not None:
+                numbers[doc_number] = len(numbers)
+        self.doc_ids = [self.doc_ids[old] for old in numbers]
+        self.doc_lengths = [self.doc_lengths[old] for old in numbers]
+        self.doc_terms = [self.doc_terms[old] for old in numbers]
+        self.doc_positions = {doc_id: doc_number for doc_number, doc_id
+                              in enumerate(self.doc_ids)}
+        for term, term_docs in self.postings.items():
+            self.postings[term] = {numbers[old]: positions
+                                   for old, positions in term_docs.items()}
+
+    def search(self, query, mode="and", limit=None):
+        """Поиск id документов по запросу, по убыванию релевантности
+
+        mode="and" требует все слова запроса, mode="or" хотя бы одно.
+        Части запроса в двойных кавычках ищутся как фраза.
+        """
+        phrases = [tokenize(phrase) for phrase in PHRASE_RE.findall(query)]
+        terms = tokenize(PHRASE_RE.sub(" ", query))
+        phrases = [phrase for phrase in phrases if phrase]
+        all_terms = set(terms).union(*phrases)
+        if not all_terms:
+            return []
+
+        if mode == "or":
+            docs = set()
+            for term in terms:
+                docs.update(self.postings.get(term, {}))
+            for phrase in phrases:
+                docs.update(self._phrase_docs(phrase))
+        else:
+            term_sets = [set(self.postings.get(term, {})) for term in terms]
+            term_sets.extend(self._phrase_docs(phrase) for phrase in phrases)
+            term_sets.sort(key=len)
+            docs = term_sets[0]
+            for other in term_sets[1:]:
+                docs = docs & other
+
+        # При равной релевантности первым идет документ, добавленный раньше
+        scores = ((self._score(doc_number, all_terms), -doc_number) for doc_number in docs
+                  if self.doc_ids[doc_number] is not None)
+        if limit is None:
+            ranked = sorted(scores, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores)
+        return [self.doc_ids[-neg_doc_number] for _, neg_doc_number in ranked]
+
+    def _phrase_docs(self, phrase):
+        """Номера документов, где слова фразы идут подряд"""
+        docs = set(self.postings.get(phrase[0], {}))
+        for term in phrase[1:]:
+            docs &= set(self.postings.get(term, {}))
+        matched = set()
+        for doc_number in docs:
+            starts = set(self.postings[phrase[0]][doc_number])
+            for offset, term in enumerate(phrase[1:], start=1):
+                term_positions = self.postings[term][doc_number]
+                starts &= {position - offset for position in term_positions}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc_number)
+        return matched
+
+    def _score(self, doc_number, terms):
+        """TF-IDF релевантность документа для слов запроса"""
+        docs_count = len(self.doc_positions)
+        doc_length = self.doc_lengths[doc_number] or 1
+        score = 0.0
+        for term in terms:
+            term_docs = self.postings.get(term)
+            if not term_docs or doc_number not in term_docs:
+                continue
+            idf = math.log(1 + docs_count / len(term_docs))
+            score += len(term_docs[doc_number]) / doc_length * idf
+        return score
+
+    def save(self, file_name):
+        """Сохранение индекса в json файл, перед сохранением индекс сжимается"""
+        self.compact()
+        with open(file_name, "w", encoding="utf-8") as file:
+            json.dump({
+                "doc_ids": self.doc_ids,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings
+            }, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_name):
+        """Загрузка индекса, сохраненного методом save"""
+        with open(file_name, "r", encoding="utf-8") as file:
+            stored = json.load(file)
+        index = cls()
+        index.doc_ids = stored["doc_ids"]
+        index.doc_lengths = stored["doc_lengths"]
+        index.doc_positions = {doc_id: doc_number for doc_number, doc_id
+                               in enumerate(index.doc_ids) if doc_id is not None}
+        doc_terms = [[] for _ in index.doc_ids]
+        for token, token_docs in stored["postings"].items():
+            index.postings[token] = {int(doc_number): positions
+                                     for doc_number, positions in token_docs.items()}
+            for doc_number in index.postings[token]:
+                doc_terms[doc_number].append(token)
+        index.doc_terms = [tuple(terms) for terms in doc_terms]
+        return index
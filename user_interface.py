@@ -1,6 +1,10 @@
+from itertools import islice
+
 from vacancy_operator import VacancyOperator
 from json_manager import JsonOperator
 
+MAX_PRINTED_VACANCIES = 100
+
 
 class UserInterface:
     """Класс пользовательского интерфейса"""
@@ -8,6 +12,7 @@ class UserInterface:
     def __init__(self, vac_list):
         """Инициализация для работы с пользователем"""
         self.vac_list = vac_list
+        self.vac_operator = VacancyOperator(vac_list)
 
     @staticmethod
     def functions_choosing():
@@ -33,8 +38,8 @@ class UserInterface:
 
                 # Вывод полного списка вакансий
                 if chosen_func == "1":
-                    all_vac_inst_1 = VacancyOperator(self.vac_list)
-                    all_vac = output_formatting(all_vac_inst_1.get_all_valid_vacancies())
+                    all_vac = output_formatting(islice(
+                        self.vac_operator.get_all_valid_vacancies(), MAX_PRINTED_VACANCIES))
                     for item in all_vac:
                         print(item)
 
@@ -42,32 +47,28 @@ class UserInterface:
                 if chosen_func == "2":
                     n_input = int(input(f"Введите желаемое количество вакансий для "
                                         f"обработки:\n> "))
-                    all_vac_inst_2 = VacancyOperator(self.vac_list)
-                    top_n = output_formatting(all_vac_inst_2.get_top_n_vacancies_by_sal(n_input))
+                    top_n = output_formatting(
+                        self.vac_operator.get_top_n_vacancies_by_sal(n_input))
                     for item in top_n:
                         print(item)
 
                 # Вывод отфильтрованных вакансий по минимальной зарплате
                 if chosen_func == "3":
                     min_sal_input = int(input(f"Введите минимальный уровень зарплаты:\n> "))
-                    all_vac_inst_3 = VacancyOperator(self.vac_list)
-                    min_sal_list = output_formatting(all_vac_inst_3.get_vac_by_min_salary
-                                                     (min_sal_input))
+                    min_sal_list = self.vac_operator.get_vac_by_min_salary(min_sal_input)
                     if len(min_sal_list) == 0:
                         print(f"Кажется у Вас слишком высокие требования :)\n"
                               f"Таких вакансий не нашлось.\n")
                     else:
-                        for item in min_sal_list:
+                        for item in output_formatting(min_sal_list):
                             print(item)
 
                 # Вывод вакансий по ключевому слову в описании
                 if chosen_func == "4":
                     keyword_input = input(f"Введите ключевое слово:\n> ")
-                    all_vac_inst_4 = VacancyOperator(self.vac_list)
-                    key_word_list = output_formatting(all_vac_inst_4.get_vac_by_keyword
-                                                      (keyword_input))
+                    key_word_list = self.vac_operator.get_vac_by_keyword(keyword_input)
                     if len(key_word_list) > 0:
-                        for item in key_word_list:
+                        for item in output_formatting(key_word_list):
                             print(item)
                     else:
                         print(f"Упс. Кажется такого слова нет ни в одном описании найденных "
@@ -81,8 +82,7 @@ class UserInterface:
 
                 # Сравнение двух вакансий по минимальной зарплате
                 if chosen_func == "6":
-                    all_vac_inst_5 = VacancyOperator(self.vac_list)
-                    all_vac = output_formatting(all_vac_inst_5.get_all_valid_vacancies())
+                    all_vac = output_formatting(self.vac_operator.get_all_valid_vacancies())
                     for item in all_vac:
                         print(item)
                     print()
@@ -92,13 +92,13 @@ class UserInterface:
                                                         f"номер первой вакансии:\n> "))
                         second_vac_num_input = int(input(f"Введи порядковый "
                                                          f"номер второй вакансии:\n> "))
-                        if (first_vac_num_input > len(all_vac_inst_5.get_all_valid_vacancies()) or
-                                second_vac_num_input > len(
-                                    all_vac_inst_5.get_all_valid_vacancies())):
+                        vac_count = len(self.vac_list)
+                        if not (1 <= first_vac_num_input <= vac_count
+                                and 1 <= second_vac_num_input <= vac_count):
                             print(f"Таких вакансии нет в списке. Введите верный №.")
                         else:
-                            result = all_vac_inst_5.two_vac_comp_by_min_sal(first_vac_num_input,
-                                                                            second_vac_num_input)
+                            result = self.vac_operator.two_vac_comp_by_min_sal(
+                                first_vac_num_input, second_vac_num_input)
                             break
 
                     if result:
@@ -119,20 +119,19 @@ class UserInterface:
             print("Упс. Кажется не нашлось ни одной вакансии с полными данными.")
 
 
-def output_formatting(hh_vac_valid_list):
-    """Метод для преобразования json формата в читабельный формат"""
-    hh_formed_vac = []
-    counter = 1
-    for vacancy in hh_vac_valid_list:
+def output_formatting(hh_vac_valid_list, start=1):
+    """Генератор вакансий в читабельном формате, строка готовится при выводе
+
+    start - номер первой вакансии, например смещение страницы + 1.
+    """
+    for counter, vacancy in enumerate(hh_vac_valid_list, start):
         vacancies_items = f"""Вакансия № {counter}
-Наименование вакансии: {vacancy["Наименование вакансии"]}
-Ссылка на вакансию: {vacancy["Ссылка на вакансию"]}
-Зарплата от: {vacancy["Зарплата от"]}
-Зарплата до: {vacancy["Зарплата до"]}
-Валюта: {vacancy["Валюта"]}
-Название компании: {vacancy["Название компании"]}
-Требования и обязанности: {vacancy["Требования и обязанности"]}\n"""
-
-        hh_formed_vac.append(vacancies_items)
-        counter += 1
-    return hh_formed_vac
+Наименование вакансии: {vacancy.name}
+Ссылка на вакансию: {vacancy.url}
+Зарплата от: {vacancy.salary_from or "не указана"}
+Зарплата до: {vacancy.salary_to or "не указана"}
+Валюта: {vacancy.currency}
+Название компании: {vacancy.employer}
+Требования и обязанности: {vacancy.description}\n"""
+
+        yield vacancies_items
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+
+# Ключи json формата, в котором вакансии хранятся и выводятся
+JSON_KEYS = {
+    "name": "Наименование вакансии",
+    "url": "Ссылка на вакансию",
+    "salary_from": "Зарплата от",
+    "salary_to": "Зарплата до",
+    "currency": "Валюта",
+    "employer": "Название компании",
+    "description": "Требования и обязанности",
+    "source": "Платформа",
+    "vacancy_id": "ID вакансии",
+    "city": "Город",
+    "extra_urls": "Ссылки на других платформах"
+}
+
+
+@dataclass(slots=True)
+class Vacancy:
+    """Вакансия в общем для всех платформ виде"""
+    name: str
+    url: str
+    salary_from: int | None
+    salary_to: int | None
+    currency: str
+    employer: str
+    description: str
+    source: str = ""
+    vacancy_id: str = ""
+    city: str = ""
+    extra_urls: tuple = ()
+
+    def to_dict(self):
+        """Преобразование в словарь json формата"""
+        vacancy_info = {json_key: getattr(self, field) for field, json_key in JSON_KEYS.items()}
+        vacancy_info[JSON_KEYS["extra_urls"]] = list(self.extra_urls)
+        return vacancy_info
+
+    @classmethod
+    def from_dict(cls, vacancy_info):
+        """Создание вакансии из словаря json формата
+
+        Для записей, сохраненных до появления платформы и id, id берется из ссылки.
+        """
+        values = {field: vacancy_info.get(json_key) for field, json_key in JSON_KEYS.items()}
+        values["source"] = values["source"] or ""
+        values["vacancy_id"] = values["vacancy_id"] or values["url"] or ""
+        values["city"] = values["city"] or ""
+        values["extra_urls"] = tuple(values["extra_urls"] or ())
+        return cls(**values)
+
+
+def make_vacancy_id(source, source_id):
+    """Стабильный id вакансии: платформа и id вакансии на платформе"""
+    return f"{source}:{source_id}"
@@ -1,38 +1,138 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from metrics import registry
+from text_index import InvertedIndex
+
+
 class VacancyOperator:
-    """Класс для валидации данных и сравнения вакансий по минимальной зарплате"""
+    """Класс для валидации данных и сравнения вакансий по минимальной зарплате
+
+    При создании один раз строится индекс вакансий, отсортированный по убыванию
+    минимальной зарплаты, и индексы по компании и валюте. Фильтры по зарплате
+    находят границы в индексе бинарным поиском, а топ N берется срезом индекса.
+    Полнотекстовый индекс строится при первом поиске по ключевым словам,
+    либо передается готовым (например, загруженным с диска).
+    """
 
-    def __init__(self, valid_vacancies_list):
+    def __init__(self, valid_vacancies_list, text_index=None):
         self.valid_vacancies_list = valid_vacancies_list
+        self.text_index = text_index
+        self._build_indexes()
 
+    def add_vacancies(self, vacancies):
+        """Добавление вакансий, например новой страницы выдачи"""
+        vacancies = list(vacancies)
+        self.valid_vacancies_list.extend(vacancies)
+        self._build_indexes()
+        if self.text_index is not None:
+            self.text_index.add_vacancies(vacancies)
+
+    @registry.timed("vacancy_index")
+    def _build_indexes(self):
+        """Построение индексов по зарплате, компании и валюте"""
+        with_salary = [position for position, vacancy in enumerate(self.valid_vacancies_list)
+                       if vacancy.salary_from is not None]
+        # При равной зарплате сохраняется исходный порядок вакансий
+        self.salary_index = sorted(
+            with_salary, key=lambda position: -self.valid_vacancies_list[position].salary_from)
+        self.neg_salaries = [-self.valid_vacancies_list[position].salary_from
+                             for position in self.salary_index]
+
+        self.employer_index = defaultdict(list)
+        self.currency_index = defaultdict(list)
+        self.id_index = {}
+        for position, vacancy in enumerate(self.valid_vacancies_list):
+            self.employer_index[vacancy.employer].append(position)
+            self.currency_index[vacancy.currency].append(position)
+            self.id_index[vacancy.vacancy_id] = vacancy
+
+    @registry.timed("vacancy_query", query="compare")
     def two_vac_comp_by_min_sal(self, first_num, second_num):
-        """Метод сравнения двух вакансий по минимальной зарплате"""
-        min_salary_1 = self.valid_vacancies_list[first_num - 1]["Зарплата от"]
-        min_salary_2 = self.valid_vacancies_list[second_num - 1]["Зарплата от"]
+        """Метод сравнения двух вакансий по минимальной зарплате
+
+        Не указанная минимальная зарплата считается нулевой.
+        """
+        min_salary_1 = self.valid_vacancies_list[first_num - 1].salary_from or 0
+        min_salary_2 = self.valid_vacancies_list[second_num - 1].salary_from or 0
 
         return min_salary_1 >= min_salary_2
 
     def get_vac_by_min_salary(self, salary_minimum):
         """Получение отфильтрованных вакансий по минимальной зарплате"""
-        filtered_vac_by_min_sal = [item for item in self.valid_vacancies_list
-                                   if item["Зарплата от"] >= salary_minimum]
+        return self.get_vac_by_salary_range(salary_minimum)
 
-        return filtered_vac_by_min_sal
+    @registry.timed("vacancy_query", query="salary_range")
+    def get_vac_by_salary_range(self, salary_minimum=None, salary_maximum=None):
+        """Получение вакансий с минимальной зарплатой в заданном диапазоне"""
+        positions = self._salary_range_positions(salary_minimum, salary_maximum)
+        return self._vacancies_at(sorted(positions))
 
+    @registry.timed("vacancy_query", query="filter")
+    def filter_vacancies(self, salary_minimum=None, salary_maximum=None, employer=None,
+                         currency=None):
+        """Получение вакансий по сочетанию фильтров без полного перебора списка
+
+        Из индексов выбирается самый короткий набор кандидатов, остальные
+        условия проверяются только для него.
+        """
+        candidates = []
+        if employer is not None:
+            candidates.append(self.employer_index.get(employer, []))
+        if currency is not None:
+            candidates.append(self.currency_index.get(currency, []))
+        if salary_minimum is not None or salary_maximum is not None:
+            candidates.append(self._salary_range_positions(salary_minimum, salary_maximum))
+        if not candidates:
+            return self.get_all_valid_vacancies()
+
+        positions = sorted(min(candidates, key=len))
+        vacancies = self._vacancies_at(positions)
+        return [vacancy for vacancy in vacancies
+                if (employer is None or vacancy.employer == employer)
+                and (currency is None or vacancy.currency == currency)
+                and in_salary_range(vacancy.salary_from, salary_minimum, salary_maximum)]
+
+    @registry.timed("vacancy_query", query="top_n")
     def get_top_n_vacancies_by_sal(self, vac_count):
         """Получение топ N вакансий"""
-        source_list = self.valid_vacancies_list
-        final_sorted = sorted(source_list,
-                              key=lambda d: d["Зарплата от"], reverse=True)
-
-        return final_sorted[:vac_count]
+        return self._vacancies_at(self.salary_index[:vac_count])
 
-    def get_vac_by_keyword(self, keyword):
-        """Получение вакансий по ключевому слову"""
-        key_word_vac = [item for item in self.valid_vacancies_list if keyword
-                        in item["Требования и обязанности"]]
+    @registry.timed("vacancy_query", query="keyword")
+    def get_vac_by_keyword(self, keyword, mode="and", limit=None):
+        """Получение вакансий по ключевому слову
 
-        return key_word_vac
+        Поиск без учета регистра и словоформ, можно указать несколько слов
+        (mode="and" - все слова, "or" - любое) и фразу в кавычках.
+        Вакансии возвращаются по убыванию релевантности, limit ограничивает их число.
+        """
+        if self.text_index is None:
+            self.text_index = InvertedIndex()
+            self.text_index.add_vacancies(self.valid_vacancies_list)
+        found_ids = self.text_index.search(keyword, mode, limit)
+        return [self.id_index[vacancy_id] for vacancy_id in found_ids
+                if vacancy_id in self.id_index]
 
     def get_all_valid_vacancies(self):
         """Получение всех вакансий"""
         return self.valid_vacancies_list
+
+    def _salary_range_positions(self, salary_minimum=None, salary_maximum=None):
+        """Позиции вакансий с зарплатой в диапазоне, найденные бинарным поиском"""
+        start = 0 if salary_maximum is None else bisect_left(self.neg_salaries, -salary_maximum)
+        end = (len(self.neg_salaries) if salary_minimum is None
+               else bisect_right(self.neg_salaries, -salary_minimum))
+        return self.salary_index[start:end]
+
+    def _vacancies_at(self, positions):
+        return [self.valid_vacancies_list[position] for position in positions]
+
+
+def in_salary_range(salary, salary_minimum=None, salary_maximum=None):
+    """Проверка попадания зарплаты в диапазон, границы включаются"""
+    if salary_minimum is None and salary_maximum is None:
+        return True
+    if salary is None:
+        return False
+    return ((salary_minimum is None or salary >= salary_minimum)
+            and (salary_maximum is None or salary <= salary_maximum))
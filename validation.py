@@ -0,0 +1,191 @@
+import time
+from collections import Counter
+from itertools import chain, islice
+
+from metrics import registry
+
+VALIDATION_BATCH_SIZE = 100  # Совпадает с размером страницы выдачи платформ
+
+
+# Проверки значений полей: шаблоны выражений, {0}, {1} - значения полей правила.
+# Записи разобраны из JSON, где метод strip есть только у строк, а срез,
+# равный строке, бывает только у строки: для других типов проверка не проходит
+# или дает AttributeError/TypeError, то есть отказ правила
+CHECKS = {
+    "identifier": "(type({0}) is int or (type({0}) is str and {0}))",
+    "text": "{0}.strip()",
+    "https_url": "{0}[:8] == 'https://'",
+    "any_positive_int": "((type({0}) is int and {0} > 0) or (type({1}) is int and {1} > 0))",
+    "known_currency": "({0} in currencies)"
+}
+
+
+def compile_rules(rules, currencies=None):
+    """Сборка одной функции проверки пачки записей из списка правил
+
+    Функция validate_records(records, counts) возвращает список корректных
+    записей, а для отклоненных увеличивает counts[номер правила]. Запись
+    отклоняется первым непройденным правилом, отсутствующий ключ или None
+    на промежуточном уровне означает отказ правила. Код собирается один раз
+    на платформу, поэтому проверка записи идет без вызова функций на каждое
+    поле. currencies - коды валют с известным курсом для known_currency.
+    """
+    namespace = {"currencies": currencies if currencies is not None else {}}
+    checks = []
+    parents = {}
+    for _, paths, check in rules:
+        # Вложенные объекты (например salary) достаются из записи один раз
+        # и переиспользуются следующими правилами
+        assignments = []
+        getters = []
+        for path in paths:
+            *parent_keys, key = path.split(".")
+            parent = "record"
+            for depth in range(1, len(parent_keys) + 1):
+                parent_path = tuple(parent_keys[:depth])
+                if parent_path not in parents:
+                    parents[parent_path] = f"parent_{len(parents)}"
+                    assignments.append(f"{parents[parent_path]} = {parent}[{parent_path[-1]!r}]")
+                parent = parents[parent_path]
+            # Для правил по нескольким полям отсутствующее поле считается пустым
+            getters.append(f"{parent}.get({key!r})" if len(paths) > 1
+                           else f"{parent}[{key!r}]")
+        # Поле достается при первом использовании в проверке, поэтому второе
+        # поле any_positive_int не читается, если первое подошло
+        condition = CHECKS[check]
+        for number, getter in enumerate(getters):
+            placeholder = f"{{{number}}}"
+            condition = condition.replace(placeholder, f"(value_{number} := {getter})", 1)
+            condition = condition.replace(placeholder, f"value_{number}")
+        checks.append((assignments, condition))
+
+    def check_lines(indent, on_fail, track_rule):
+        lines = []
+        for number, (assignments, condition) in enumerate(checks):
+            if track_rule:
+                lines.append(f"{indent}rule = {number}")
+            lines.extend(f"{indent}{assignment}" for assignment in assignments)
+            lines.append(f"{indent}if not {condition}:")
+            lines.extend(f"{indent}    {line}".format(number=number) for line in on_fail)
+        return lines
+
+    # Номер правила, на котором упала запись, ищется отдельно: ошибки редки,
+    # и основной цикл не тратит время на запоминание текущего правила
+    source = [
+        "def find_failed_rule(record):",
+        "    rule = 0",
+        "    try:",
+        *check_lines("        ", ["return {number}"], track_rule=True),
+        "    except (KeyError, TypeError, AttributeError):",
+        "        return rule",
+        "",
+        "def validate_records(records, counts):",
+        "    accepted = []",
+        "    append = accepted.append",
+        "    for record in records:",
+        "        try:",
+        *check_lines("            ", ["counts[{number}] += 1", "continue"], track_rule=False),
+        "            append(record)",
+        "        except (KeyError, TypeError, AttributeError):",
+        "            counts[find_failed_rule(record)] += 1",
+        "    return accepted"
+    ]
+    exec("\n".join(source), namespace)
+    return namespace["validate_records"]
+
+
+class SchemaValidator:
+    """Декларативная проверка вакансий, общая для всех платформ
+
+    Правила компилируются в одну функцию один раз при создании, страница
+    проверяется целиком. Запись отклоняется первым непройденным правилом
+    и учитывается в счетчике этого правила. Валюта принимается, если для нее
+    известен курс в таблице currencies (CurrencyRates.multipliers): курсы
+    загружаются заранее, валидатор к сети не обращается.
+    Время проверки и отказы попадают в метрики с меткой platform=name:
+    validate_batch пишет их на каждую пачку, iter_valid - один раз за поток.
+    """
+
+    def __init__(self, rules, currencies=None, name=""):
+        self.name = name
+        self.rule_names = [rule[0] for rule in rules]
+        if currencies is None and any(rule[2] == "known_currency" for rule in rules):
+            raise ValueError("Для проверки валюты нужна таблица курсов currencies")
+        self.validate_records = compile_rules(rules, currencies)
+        self.rejections = Counter()
+        self.accepted = 0
+
+    def validate_batch(self, records):
+        """Проверка пачки записей, возвращает принятые записи и счетчик отказов"""
+        started = time.perf_counter()
+        counts = [0] * len(self.rule_names)
+        accepted = self.validate_records(records, counts)
+        rejections = self._record(time.perf_counter() - started, len(records), len(accepted),
+                                  counts)
+        return accepted, rejections
+
+    def iter_valid(self, records, batch_size=VALIDATION_BATCH_SIZE):
+        """Итератор корректных записей, проверка идет пачками по batch_size
+
+        Принятые записи отдаются через chain без генератора на каждую запись.
+        """
+        return chain.from_iterable(self.iter_valid_batches(records, batch_size))
+
+    def iter_valid_batches(self, records, batch_size=VALIDATION_BATCH_SIZE):
+        """Генератор списков корректных записей по пачкам из batch_size записей"""
+        records = iter(records)
+        counts = [0] * len(self.rule_names)
+        elapsed = 0.0
+        checked = accepted_count = 0
+        try:
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    return
+                started = time.perf_counter()
+                accepted = self.validate_records(batch, counts)
+                elapsed += time.perf_counter() - started
+                checked += len(batch)
+                accepted_count += len(accepted)
+                yield accepted
+        finally:
+            # Учитывается только время проверки, без ожидания источника
+            if checked:
+                self._record(elapsed, checked, accepted_count, counts)
+
+    def _record(self, elapsed, checked, accepted, counts):
+        """Учет результата проверки в счетчиках валидатора и метриках"""
+        registry.observe_stage("validation", elapsed, checked, platform=self.name)
+        rejections = Counter({name: count for name, count in zip(self.rule_names, counts)
+                              if count})
+        self.rejections.update(rejections)
+        self.accepted += accepted
+        registry.inc("validation_records_total", accepted, platform=self.name,
+                     result="accepted")
+        for rule_name, count in rejections.items():
+            registry.inc("validation_records_total", count, platform=self.name,
+                         result="rejected", rule=rule_name)
+        return rejections
+
+
+# Правила: имя, пути к полям и проверка из CHECKS
+HH_RULES = [
+    ("id", ["id"], "identifier"),
+    ("name", ["name"], "text"),
+    ("url", ["alternate_url"], "https_url"),
+    ("salary", ["salary.from", "salary.to"], "any_positive_int"),
+    ("currency", ["salary.currency"], "known_currency"),
+    ("employer", ["employer.name"], "text"),
+    ("requirement", ["snippet.requirement"], "text"),
+    ("responsibility", ["snippet.responsibility"], "text")
+]
+
+SJ_RULES = [
+    ("id", ["id"], "identifier"),
+    ("name", ["profession"], "text"),
+    ("url", ["link"], "https_url"),
+    ("salary", ["payment_from", "payment_to"], "any_positive_int"),
+    ("currency", ["currency"], "known_currency"),
+    ("employer", ["client.title"], "text"),
+    ("requirement", ["candidat"], "text")
+]